@@ -1,13 +1,33 @@
 from django.contrib import admin
 
+from . import search
 from .models import Post, Group, Comment, Follow
+from .paginators import EstimatedCountPaginator
 
 
-class PostAdmin(admin.ModelAdmin):
+class ScalableAdmin(admin.ModelAdmin):
+    """
+    Общие настройки списков для больших таблиц: оценка числа строк
+    вместо COUNT(*) и без второго подсчёта всей таблицы при фильтрах.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    empty_value_display = "-пусто-"
+
+
+class PostAdmin(ScalableAdmin):
     list_display = ("pk", "text", "pub_date", "author", "group")
+    list_select_related = ("author", "group")
     search_fields = ("text",)
     list_filter = ("pub_date",)
-    empty_value_display = "-пусто-"
+    date_hierarchy = "pub_date"
+    autocomplete_fields = ("author", "group")
+
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по полнотекстовому индексу вместо icontains.
+        if not search_term:
+            return queryset, False
+        return search.search(search_term, queryset), False
 
 
 admin.site.register(Post, PostAdmin)
@@ -24,20 +44,23 @@ class GroupAdmin(admin.ModelAdmin):
 admin.site.register(Group, GroupAdmin)
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ScalableAdmin):
     list_display = ("pk", "author", "text", "created",)
-    search_fields = ("author",)
+    list_select_related = ("author",)
+    search_fields = ("text", "author__username",)
     list_filter = ("created",)
-    empty_value_display = "-пусто-"
+    date_hierarchy = "created"
+    autocomplete_fields = ("author", "post")
 
 
 admin.site.register(Comment, CommentAdmin)
 
 
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(ScalableAdmin):
     list_display = ("pk", "author", "user")
-    search_fields = ("author",)
-    empty_value_display = "-пусто-"
+    list_select_related = ("author", "user")
+    search_fields = ("author__username", "user__username",)
+    autocomplete_fields = ("author", "user")
 
 
 admin.site.register(Follow, FollowAdmin)
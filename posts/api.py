@@ -0,0 +1,121 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, viewsets
+
+from .models import Post, Group, Follow, TimelineEntry, User
+from .serializers import (
+    PostSerializer, GroupSerializer, CommentSerializer, FollowSerializer
+)
+
+
+class SparseFieldsViewMixin:
+    """
+    ?fields=... сужает и запрос: .only() читает только колонки
+    выбранных полей, ключей сортировки и первичный ключ, а
+    select_related — только нужные им связи и связь sparse_prefix.
+    """
+    # Путь от модели запроса к модели сериализатора.
+    sparse_prefix = ''
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self.request.query_params.get('fields'):
+            return queryset
+        annotations = queryset.query.annotations
+        ordering = getattr(
+            self, 'ordering', getattr(self.pagination_class, 'ordering', ())
+        )
+        paths = {'pk'} | {name.lstrip('-') for name in ordering}
+        prefix = self.sparse_prefix.split('__')[:-1]
+        # Сериализатор всегда читает объект по этой связи.
+        relations = {
+            '__'.join(prefix[:end]) for end in range(1, len(prefix) + 1)
+        }
+        for path in self.get_serializer().model_paths():
+            if path.split('__')[0] in annotations:
+                continue
+            parts = (self.sparse_prefix + path).split('__')
+            paths.add('__'.join(parts))
+            relations.update(
+                '__'.join(parts[:end]) for end in range(1, len(parts))
+            )
+        queryset = queryset.select_related(None)
+        if relations:
+            queryset = queryset.select_related(*relations)
+        return queryset.only(*paths)
+
+
+class PostViewSet(SparseFieldsViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Лента всех постов; ?group=<slug> и ?author=<username> сужают её.
+    """
+    serializer_class = PostSerializer
+
+    def get_queryset(self):
+        posts = Post.objects.for_feed()
+        group = self.request.query_params.get('group')
+        if group:
+            posts = posts.filter(group__slug=group)
+        author = self.request.query_params.get('author')
+        if author:
+            posts = posts.filter(author__username=author)
+        return posts
+
+
+class PostCommentsView(SparseFieldsViewMixin, generics.ListAPIView):
+    serializer_class = CommentSerializer
+    ordering = ('-created', '-id')
+
+    def get_queryset(self):
+        post = get_object_or_404(Post, id=self.kwargs['post_id'])
+        return post.comments.select_related('author')
+
+
+class GroupViewSet(SparseFieldsViewMixin, viewsets.ReadOnlyModelViewSet):
+    serializer_class = GroupSerializer
+    queryset = Group.objects.all()
+    lookup_field = 'slug'
+    ordering = ('id',)
+
+
+class FeedView(SparseFieldsViewMixin, generics.ListAPIView):
+    """
+    Посты авторов, на которых подписан пользователь.
+    """
+    serializer_class = PostSerializer
+    ordering = ('-pub_date', '-post_id')
+    sparse_prefix = 'post__'
+
+    def get_queryset(self):
+        # Не через user.timeline: менеджер связи читает user_id каждой
+        # записи, а .only() его откладывает.
+        return TimelineEntry.objects.filter(
+            user=self.request.user
+        ).for_feed()
+
+    def list(self, request, *args, **kwargs):
+        entries = self.paginate_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        for entry in entries:
+            entry.post.comment_count = entry.comment_count
+        serializer = self.get_serializer(
+            [entry.post for entry in entries],
+            many=True
+        )
+        return self.get_paginated_response(serializer.data)
+
+
+class FollowListView(SparseFieldsViewMixin, generics.ListAPIView):
+    """
+    Подписки пользователя (following) или его подписчики (followers).
+    """
+    serializer_class = FollowSerializer
+    ordering = ('-id',)
+    relation = 'following'
+
+    def get_queryset(self):
+        user = get_object_or_404(User, username=self.kwargs['username'])
+        follows = Follow.objects.select_related('user', 'author')
+        if self.relation == 'following':
+            return follows.filter(user=user)
+        return follows.filter(author=user)
@@ -0,0 +1,121 @@
+"""
+Асинхронные версии лент, профиля и страницы поста для ASGI
+(yatube/asgi.py, адреса yatube/asgi_urls.py).
+
+Независимые чтения одной страницы выполняются одновременно в пуле
+yatube.aio. Шаблоны отрисовываются там же: карточки и миниатюры
+обращаются к кэшу и базе.
+"""
+import asyncio
+from functools import wraps
+
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import get_object_or_404, render
+
+from yatube import aio
+
+from .caching import cache_feed, feed_etag
+from .forms import CommentForm
+from .models import Follow, Group, Post, User
+from .views import _comments, _feed_page, _follow_page
+
+
+def _login_required(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if await aio.run(lambda: request.user.is_authenticated):
+            return await view(request, *args, **kwargs)
+        return redirect_to_login(request.get_full_path())
+    return wrapper
+
+
+def _following(request, username):
+    return request.user.is_authenticated and Follow.objects.filter(
+        user=request.user,
+        author__username=username
+    ).exists()
+
+
+@feed_etag('posts')
+@cache_feed('posts')
+async def index(request):
+    paginator, page = await aio.run(
+        _feed_page, request, Post.objects.for_feed()
+    )
+    return await aio.run(render, request, 'index.html', {
+        'page': page,
+        'paginator': paginator
+    })
+
+
+@feed_etag('group:{slug}')
+@cache_feed('group:{slug}')
+async def group_posts(request, slug):
+    group, (paginator, page) = await asyncio.gather(
+        aio.run(get_object_or_404, Group, slug=slug),
+        aio.run(
+            _feed_page,
+            request,
+            Post.objects.for_feed().filter(group__slug=slug)
+        )
+    )
+    return await aio.run(render, request, 'group.html', {
+        'group': group,
+        'page': page,
+        'paginator': paginator
+    })
+
+
+@feed_etag('profile:{username}')
+@cache_feed('profile:{username}')
+async def profile(request, username):
+    author, (paginator, page), following = await asyncio.gather(
+        aio.run(
+            get_object_or_404,
+            User.objects.select_related('counters'),
+            username=username
+        ),
+        aio.run(
+            _feed_page,
+            request,
+            Post.objects.for_feed().filter(author__username=username)
+        ),
+        aio.run(_following, request, username)
+    )
+    return await aio.run(render, request, 'profile.html', {
+        'author': author,
+        'paginator': paginator,
+        'page': page,
+        'following': following
+    })
+
+
+@feed_etag('profile:{username}', csrf=True)
+async def post_view(request, username, post_id):
+    post, (comments, comment_page) = await asyncio.gather(
+        aio.run(
+            get_object_or_404,
+            Post.objects.for_feed().select_related('author__counters'),
+            id=post_id,
+            author__username=username
+        ),
+        aio.run(_comments, request, post_id)
+    )
+    return await aio.run(render, request, 'post.html', {
+        'post': post,
+        'author': post.author,
+        'comments': comments,
+        'comment_page': comment_page,
+        'form': CommentForm()
+    })
+
+
+@_login_required
+@feed_etag('posts', 'follow:{user}')
+@cache_feed('posts', 'follow:{user}')
+async def follow_index(request):
+    paginator, page = await aio.run(_follow_page, request)
+    return await aio.run(render, request, 'follow.html', {
+        'page': page,
+        'paginator': paginator
+    })
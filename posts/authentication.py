@@ -0,0 +1,38 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+TOKEN_KEY = 'api-token:{}'
+
+
+def token_cache_key(key):
+    # В ключ кэша попадает хэш, а не сам токен.
+    return TOKEN_KEY.format(hashlib.sha256(key.encode()).hexdigest())
+
+
+def forget_tokens(user):
+    keys = Token.objects.filter(user=user).values_list('key', flat=True)
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Токен и пользователь берутся из кэша, без запроса к базе.
+    Запись сбрасывается при изменении пользователя или удалении токена.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        user, token = super().authenticate_credentials(key)
+        cache.set(
+            cache_key,
+            (user, token),
+            settings.API_TOKEN_CACHE_TIMEOUT
+        )
+        return user, token
@@ -0,0 +1,306 @@
+"""
+Замеры страниц на большом наборе данных: задержка, число SQL-запросов,
+прочитанные строки и размер ответа. Результаты сравниваются с эталоном
+benchmarks.json, снятым на базе из
+
+    manage.py generate_data --users 5000 --posts 100000 \
+        --comments 300000 --images 5 --seed 1
+"""
+import json
+import os
+import statistics
+import time
+from contextlib import contextmanager, nullcontext
+from unittest import mock
+from urllib.parse import urlsplit
+
+import sentry_sdk
+from django.conf import settings
+from django.core.cache import cache
+from asgiref.sync import async_to_sync
+from django.db import (
+    DEFAULT_DB_ALIAS, close_old_connections, connections, models,
+    transaction
+)
+from django.db.backends.utils import CursorWrapper
+from django.test import AsyncClient, Client, override_settings
+from django.urls import URLResolver, reverse
+from rest_framework.authtoken.models import Token
+
+from posts import urls as posts_urls
+from posts.models import Group, User
+from users import urls as users_urls
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'benchmarks.json')
+PERCENTILES = (50, 95, 99)
+# Подписка и отписка от себя бессмысленны — для них берётся другой автор.
+OTHER_AUTHOR_VIEWS = ('profile_follow', 'profile_unfollow')
+QUERY_VIEWS = ('search', 'search_api')
+
+
+class RowCounter:
+    """
+    Считает запросы и строки, которые прочитал Django из курсоров.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+
+    def cursor(self, wrapper, cursor):
+        counter = self
+
+        class CountingCursor(CursorWrapper):
+
+            def execute(self, sql, params=None):
+                counter.queries += 1
+                return super().execute(sql, params)
+
+            def executemany(self, sql, param_list):
+                counter.queries += 1
+                return super().executemany(sql, param_list)
+
+            def fetchone(self):
+                row = self.cursor.fetchone()
+                counter.rows += row is not None
+                return row
+
+            def fetchmany(self, size=None):
+                rows = self.cursor.fetchmany(
+                    size or self.cursor.arraysize
+                )
+                counter.rows += len(rows)
+                return rows
+
+            def fetchall(self):
+                rows = self.cursor.fetchall()
+                counter.rows += len(rows)
+                return rows
+
+        return CountingCursor(cursor, wrapper)
+
+    @contextmanager
+    def installed(self):
+        # Подмена в классе: асинхронные представления читают базу
+        # через соединения других потоков.
+        backend = type(connections[DEFAULT_DB_ALIAS])
+
+        def make_cursor(wrapper, cursor):
+            return self.cursor(wrapper, cursor)
+
+        with mock.patch.object(backend, 'make_cursor', make_cursor), \
+                mock.patch.object(backend, 'make_debug_cursor', make_cursor):
+            yield self
+
+
+def _patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _patterns(pattern.url_patterns)
+            continue
+        params = list(pattern.pattern.regex.groupindex)
+        # У роутера DRF у каждого адреса есть копия с .json и т. п.
+        if pattern.name and 'format' not in params:
+            yield pattern.name, params
+
+
+def sample():
+    """
+    Самые тяжёлые объекты набора: автор с наибольшим числом постов,
+    его пост с наибольшим числом комментариев, самая большая группа
+    и автор, на которого он подписан.
+    """
+    author = User.objects.annotate(
+        total=models.Count('posts')
+    ).order_by('-total', 'id').first()
+    post = author.posts.annotate(
+        total=models.Count('comments')
+    ).order_by('-total', '-id').first()
+    group = Group.objects.annotate(
+        total=models.Count('posts')
+    ).order_by('-total', 'id').first()
+    followed = author.follower.select_related('author').first()
+    return {
+        'author': author,
+        'post': post,
+        'group': group,
+        'followed': followed.author if followed else author,
+    }
+
+
+def cases(objects):
+    """
+    Пары (имя адреса, URL) для всех именованных адресов posts и users.
+    """
+    post = objects['post']
+    values = {
+        'username': objects['author'].username,
+        'post_id': post.id,
+        'pk': post.id,
+        'slug': objects['group'].slug,
+    }
+    seen = set()
+    patterns = [*posts_urls.urlpatterns, *users_urls.urlpatterns]
+    for name, params in _patterns(patterns):
+        if name in seen:
+            continue
+        seen.add(name)
+        kwargs = {param: values[param] for param in params}
+        if name in OTHER_AUTHOR_VIEWS:
+            kwargs['username'] = objects['followed'].username
+        url = reverse(name, kwargs=kwargs)
+        if name in QUERY_VIEWS:
+            url += '?q=' + post.text.split()[0]
+        yield name, url
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = round((len(values) - 1) * percent / 100)
+    return values[index]
+
+
+def _transaction(url, traces):
+    # Тестовый клиент минует WSGI-обработчик, который открывает
+    # транзакцию Sentry, поэтому она открывается здесь.
+    if traces is None:
+        return nullcontext()
+    return sentry_sdk.start_transaction(
+        op='http.server',
+        name=url,
+        custom_sampling_context={
+            'wsgi_environ': {'PATH_INFO': urlsplit(url).path}
+        }
+    )
+
+
+def _finish_request():
+    # Тестовый клиент не закрывает соединения после запроса, как
+    # request_finished; без этого не видна цена их открытия
+    # (DATABASE_CONN_MAX_AGE=0). В транзакции теста закрывать нельзя.
+    if not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        close_old_connections()
+
+
+def measure(get, url, repeat, warm=False, traces=None):
+    """
+    Запрашивает URL функцией get repeat раз, по умолчанию — с пустым
+    кэшем, чтобы были видны все запросы отрисовки. Изменения в базе
+    каждого запроса откатываются. traces — доля трассируемых запросов
+    (см. run()).
+    """
+    timings = []
+    counter = RowCounter()
+    for _ in range(repeat):
+        if not warm:
+            cache.clear()
+        counter.queries = counter.rows = 0
+        # Время включает открытие соединения, если прошлое закрылось.
+        started = time.perf_counter()
+        with transaction.atomic(), counter.installed():
+            with _transaction(url, traces):
+                response = get(url)
+            transaction.set_rollback(True)
+        timings.append((time.perf_counter() - started) * 1000)
+        _finish_request()
+    result = {
+        'status': response.status_code,
+        'queries': counter.queries,
+        'rows': counter.rows,
+        'bytes': len(response.content),
+        'mean': round(statistics.mean(timings), 2),
+    }
+    for percent in PERCENTILES:
+        result[f'p{percent}'] = round(percentile(timings, percent), 2)
+    return result
+
+
+@contextmanager
+def _traces_override(traces):
+    sampler = settings.TRACES_SAMPLER
+    sampler.override = traces
+    try:
+        yield
+    finally:
+        sampler.override = None
+
+
+def run(repeat=20, names=None, warm=False, traces=None, asgi=False):
+    """
+    Замеры всех адресов от имени автора из sample(). Возвращает
+    словарь {имя адреса: результат}. С traces запросы трассируются
+    с этой долей (0 — трассировка выключена), но ничего не отправляется.
+    С asgi запросы идут через обработчик ASGI и адреса yatube.asgi_urls.
+    """
+    results = {}
+    urlconf = 'yatube.asgi_urls' if asgi else settings.ROOT_URLCONF
+    with override_settings(ALLOWED_HOSTS=['testserver'],
+                           ROOT_URLCONF=urlconf), \
+            _traces_override(traces):
+        objects = sample()
+        author = objects['author']
+        # Сессия и токен сохраняются, а не откатываются: асинхронные
+        # представления читают их через другие соединения.
+        token, created = Token.objects.get_or_create(user=author)
+        authorization = f'Token {token.key}'
+        if asgi:
+            client = AsyncClient()
+
+            async def get_async(url):
+                return await client.get(url, authorization=authorization)
+            get = async_to_sync(get_async)
+        else:
+            client = Client(HTTP_AUTHORIZATION=authorization)
+            get = client.get
+        client.force_login(author)
+        try:
+            for name, url in cases(objects):
+                if names and name not in names:
+                    continue
+                # Первый запрос прогревает сессию и импорты.
+                measure(get, url, 1)
+                results[name] = {
+                    'url': url,
+                    **measure(get, url, repeat, warm, traces)
+                }
+        finally:
+            client.logout()
+            if created:
+                token.delete()
+    return results
+
+
+def load_baseline(path=BASELINE):
+    with open(path, encoding='utf-8') as baseline:
+        return json.load(baseline)
+
+
+def save_baseline(results, path=BASELINE):
+    with open(path, 'w', encoding='utf-8') as baseline:
+        json.dump(results, baseline, ensure_ascii=False, indent=2)
+        baseline.write('\n')
+
+
+def compare(results, baseline, tolerance=1.5, slack=10):
+    """
+    Список нарушений бюджета: запросов больше, чем в эталоне, или p95
+    дольше эталонного в tolerance раз и ещё на slack мс — у быстрых
+    страниц шум измерений сравним с самим временем.
+    """
+    failures = []
+    for name, result in results.items():
+        budget = baseline.get(name)
+        if budget is None:
+            continue
+        if result['queries'] > budget['queries']:
+            failures.append(
+                f"{name}: {result['queries']} запросов "
+                f"при бюджете {budget['queries']}"
+            )
+        limit = budget['p95'] * tolerance + slack
+        if tolerance and result['p95'] > limit:
+            failures.append(
+                f"{name}: p95 {result['p95']} мс "
+                f"при бюджете {limit:.2f} мс"
+            )
+    return failures
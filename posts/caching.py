@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.utils import translation
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition
+
+from yatube import aio
+from yatube.replicas import reading_replica
+
+VERSION_KEY = 'feed-version:{}'
+BUMPED_KEY = 'feed-bumped:{}'
+PAGE_KEY = 'feed-page:{}:{}:{}:{}'
+CARD_KEY = 'post-card:{}:{}'
+
+
+def _initial_version():
+    # Версия, созданная заново после вытеснения ключа, не совпадает
+    # с прежней, поэтому старые страницы не оживают.
+    return int(time.time() * 1000)
+
+
+def get_versions(namespaces):
+    keys = [VERSION_KEY.format(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump(*namespaces):
+    """
+    Сбрасывает все закэшированные страницы пространств имён за O(1):
+    меняется версия, входящая в ключ страницы. Время сброса хранится
+    REPLICA_PIN_SECONDS секунд: пока реплика может отставать, страницы
+    с неё не кэшируются (см. _lagging).
+    """
+    namespaces = set(namespaces)
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial_version(), None)
+    if settings.DATABASE_REPLICAS:
+        now = time.time()
+        cache.set_many(
+            {BUMPED_KEY.format(namespace): now for namespace in namespaces},
+            settings.REPLICA_PIN_SECONDS
+        )
+
+
+def _lagging(names):
+    # Страница с реплики, которая могла ещё не получить изменение,
+    # сбросившее версию: под новой версией она бы осталась устаревшей.
+    return reading_replica() and bool(cache.get_many(
+        [BUMPED_KEY.format(name) for name in names]
+    ))
+
+
+def post_changed(post, old_group_slug=None):
+    namespaces = ['posts', f'profile:{post.author.username}']
+    if post.group is not None:
+        namespaces.append(f'group:{post.group.slug}')
+    if old_group_slug is not None:
+        namespaces.append(f'group:{old_group_slug}')
+    bump(*namespaces)
+
+
+def follow_changed(user, author):
+    bump(
+        f'profile:{user.username}',
+        f'profile:{author.username}',
+        f'follow:{user.pk}',
+    )
+
+
+def card_key(post, hide=False):
+    """
+    Ключ отрисованной карточки поста. Версия — отпечаток всех данных,
+    которые попадают в карточку: правка текста, группы или картинки,
+    новый комментарий меняют ключ, и сбрасывать ничего не нужно.
+    Пост должен быть получен через for_feed().
+    """
+    group = post.group
+    parts = [
+        post.text,
+        post.image.name,
+        post.author.username,
+        group and f'{group.slug}/{group.title}',
+        post.comment_count,
+        post.pub_date.isoformat(),
+        hide,
+        translation.get_language(),
+    ]
+    version = hashlib.md5(
+        '\x1f'.join(map(str, parts)).encode()
+    ).hexdigest()
+    return CARD_KEY.format(post.pk, version)
+
+
+def _names(namespaces, request, kwargs):
+    user = request.user.pk or 0
+    return [
+        namespace.format(user=user, **kwargs)
+        for namespace in namespaces
+    ]
+
+
+def _etag(namespaces, request, kwargs, csrf=False):
+    names = _names(namespaces, request, kwargs)
+    if _lagging(names):
+        return None
+    parts = [
+        request.get_full_path(),
+        request.user.pk or 0,
+        translation.get_language(),
+        *get_versions(names),
+    ]
+    if csrf:
+        # get_token() заводит секрет, если его ещё нет: страница
+        # отрисуется с ним, а кука уйдёт и с ответом 304.
+        get_token(request)
+        parts.append(request.META['CSRF_COOKIE'])
+    return hashlib.md5('\x1f'.join(map(str, parts)).encode()).hexdigest()
+
+
+def feed_etag(*namespaces, csrf=False):
+    """
+    Условный GET по версиям пространств имён: ETag считается без
+    запросов к базе, и на совпавший If-None-Match сразу уходит 304.
+    Страница зависит ещё от адреса, пользователя и языка. Пока реплика
+    может отставать от сброса версии, ETag не выдаётся.
+    csrf=True — для страниц с формами: ETag меняется вместе с секретом
+    CSRF (вход, выход), иначе 304 оставил бы в форме старый токен.
+    """
+    def etag(request, *args, **kwargs):
+        return _etag(namespaces, request, kwargs, csrf)
+
+    def decorator(view):
+        if not asyncio.iscoroutinefunction(view):
+            return condition(etag_func=etag)(view)
+
+        # То же, что condition(), для асинхронных представлений.
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            # В пуле заодно читаются сессия и пользователь.
+            value = await aio.run(
+                _etag, namespaces, request, kwargs, csrf
+            )
+            if value is None:
+                return await view(request, *args, **kwargs)
+            value = quote_etag(value)
+            response = get_conditional_response(request, etag=value)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                response.setdefault('ETag', value)
+            return response
+        return wrapper
+    return decorator
+
+
+def _cached_page(view, namespaces, request, kwargs):
+    user = request.user.pk or 0
+    names = _names(namespaces, request, kwargs)
+    versions = '.'.join(map(str, get_versions(names)))
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    key = PAGE_KEY.format(view.__name__, path, user, versions)
+    response = cache.get(key)
+    if response is None and _lagging(names):
+        # Прочитать готовую страницу можно, сохранять новую — нет.
+        key = None
+    return key, response
+
+
+def cache_feed(*namespaces, timeout=None):
+    """
+    Кэширует страницу ленты под версиями пространств имён.
+    В шаблонах имён доступны аргументы URL и {user} — pk пользователя.
+    Асинхронные и синхронные версии представления делят страницы.
+    Страницы с реплики вскоре после сброса версии не сохраняются.
+    """
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+                key, response = await aio.run(
+                    _cached_page, view, namespaces, request, kwargs
+                )
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                    if key and response.status_code == 200:
+                        await aio.run(
+                            cache.set,
+                            key,
+                            response,
+                            timeout or settings.FEED_CACHE_TIMEOUT
+                        )
+                return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            key, response = _cached_page(view, namespaces, request, kwargs)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if key and response.status_code == 200:
+                    cache.set(
+                        key,
+                        response,
+                        timeout or settings.FEED_CACHE_TIMEOUT
+                    )
+            return response
+        return wrapper
+    return decorator
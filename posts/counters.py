@@ -0,0 +1,101 @@
+from itertools import islice
+
+from django.db import models
+from django.db.models.functions import Coalesce
+
+from .models import Follow, Post, User, UserCounters
+
+BATCH_SIZE = 1000
+
+
+def _count(model, field):
+    rows = model.objects.filter(
+        **{field: models.OuterRef('pk')}
+    ).order_by().values(field).annotate(
+        count=models.Count('pk')
+    ).values('count')
+    return Coalesce(models.Subquery(rows), 0)
+
+
+def with_actual_counts(users):
+    return users.annotate(
+        actual_posts=_count(Post, 'author'),
+        actual_followers=_count(Follow, 'author'),
+        actual_following=_count(Follow, 'user'),
+    )
+
+
+def _create(user_id, field):
+    # Строка по фактическим данным без текущего изменения: его, как и
+    # изменения параллельных запросов, добавит F() в increment().
+    user = with_actual_counts(User.objects.filter(pk=user_id)).get()
+    counts = {
+        'posts_count': user.actual_posts,
+        'followers_count': user.actual_followers,
+        'following_count': user.actual_following,
+    }
+    counts[field] = max(counts[field] - 1, 0)
+    UserCounters.objects.bulk_create(
+        [UserCounters(user_id=user_id, **counts)],
+        ignore_conflicts=True
+    )
+
+
+def increment(user_id, field):
+    """
+    Увеличивает счётчик; отсутствующую строку сначала создаёт по
+    фактическим данным. Если её одновременно создал другой запрос,
+    увеличение не теряется.
+    """
+    counters = UserCounters.objects.filter(user_id=user_id)
+    update = {field: models.F(field) + 1}
+    if not counters.update(**update):
+        _create(user_id, field)
+        counters.update(**update)
+
+
+def decrement(user_id, field):
+    UserCounters.objects.filter(
+        user_id=user_id,
+        **{f'{field}__gt': 0}
+    ).update(**{field: models.F(field) - 1})
+
+
+def reconcile(users=None):
+    """
+    Пересчитывает счётчики пачками и возвращает число исправленных строк.
+    """
+    users = with_actual_counts(
+        (users if users is not None else User.objects.all()).order_by('pk')
+    ).values_list(
+        'pk', 'actual_posts', 'actual_followers', 'actual_following'
+    ).iterator(chunk_size=BATCH_SIZE)
+    fixed = 0
+    while True:
+        batch = list(islice(users, BATCH_SIZE))
+        if not batch:
+            break
+        stored = UserCounters.objects.in_bulk([row[0] for row in batch])
+        to_create, to_update = [], []
+        for pk, posts, followers, following in batch:
+            counters = stored.get(pk)
+            if counters is None:
+                to_create.append(UserCounters(
+                    user_id=pk,
+                    posts_count=posts,
+                    followers_count=followers,
+                    following_count=following,
+                ))
+            elif (counters.posts_count, counters.followers_count,
+                  counters.following_count) != (posts, followers, following):
+                counters.posts_count = posts
+                counters.followers_count = followers
+                counters.following_count = following
+                to_update.append(counters)
+        UserCounters.objects.bulk_create(to_create, ignore_conflicts=True)
+        UserCounters.objects.bulk_update(
+            to_update,
+            ['posts_count', 'followers_count', 'following_count']
+        )
+        fixed += len(to_create) + len(to_update)
+    return fixed
@@ -1,5 +1,7 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 
+from . import search, uploads
 from .models import Post, Comment
 
 
@@ -8,8 +10,39 @@ class PostForm(forms.ModelForm):
         model = Post
         fields = ('group', 'text', 'image')
 
+    def save(self, commit=True):
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            self.instance.image = uploads.ingest(
+                image,
+                Post._meta.get_field('image')
+            )
+        return super().save(commit)
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
         fields = ('text',)
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(label='Поиск', max_length=200)
+    group = forms.SlugField(label='Сообщество', required=False)
+    author = forms.CharField(label='Автор', max_length=150, required=False)
+
+    def search(self):
+        """
+        Найденные посты с рангом; пустой результат, если форма
+        не заполнена.
+        """
+        if not self.is_valid():
+            return search.search('')
+        posts = Post.objects.for_feed()
+        if self.cleaned_data['group']:
+            posts = posts.filter(group__slug=self.cleaned_data['group'])
+        if self.cleaned_data['author']:
+            posts = posts.filter(
+                author__username=self.cleaned_data['author']
+            )
+        return search.search(self.cleaned_data['q'], posts)
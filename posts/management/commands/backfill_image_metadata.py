@@ -0,0 +1,78 @@
+import multiprocessing
+
+import django
+from django.core.management.base import BaseCommand
+
+from posts import previews
+from posts.models import Post
+
+BATCH_SIZE = 500
+FIELDS = ['image_width', 'image_height', 'image_placeholder']
+
+
+def describe(name):
+    # Выполняется в дочернем процессе: только файл, без базы данных.
+    # Django там настраивает django.setup() из initializer пула.
+    image = Post._meta.get_field('image').storage.open(name)
+    try:
+        return previews.describe(image)
+    except Exception:
+        return None
+    finally:
+        image.close()
+
+
+class Command(BaseCommand):
+    help = 'Заполняет размеры и превью картинок у уже созданных постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=None,
+            help='Число процессов (по умолчанию — число ядер)'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересчитать и уже заполненные посты'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').exclude(image=None)
+        if not options['all']:
+            posts = posts.filter(image_width=None)
+        updated = failed = 0
+        last_id = 0
+        # spawn: дочерние процессы не наследуют соединения с базой,
+        # потоки и блокировки родителя, как было бы при fork.
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(
+            options['processes'],
+            initializer=django.setup
+        ) as pool:
+            while True:
+                # Посты читаются порциями по id, а не все сразу.
+                batch = list(
+                    posts.filter(id__gt=last_id)
+                    .order_by('id')
+                    .values_list('id', 'image')[:BATCH_SIZE]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+                results = pool.map(describe, [name for _, name in batch])
+                changed = []
+                for (post_id, _), described in zip(batch, results):
+                    if described is None:
+                        failed += 1
+                        continue
+                    post = Post(id=post_id)
+                    (post.image_width, post.image_height,
+                     post.image_placeholder) = described
+                    changed.append(post)
+                Post.objects.bulk_update(changed, FIELDS)
+                updated += len(changed)
+        self.stdout.write(
+            f'Обновлено постов: {updated}, не прочитано картинок: {failed}'
+        )
@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import benchmarks
+
+COLUMNS = ('status', 'queries', 'rows', 'bytes', 'p50', 'p95', 'p99')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет страницы posts и users на текущей базе (наполните её '
+        'через generate_data) и сравнивает с эталоном'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--only',
+            nargs='+',
+            help='Имена адресов, например index post'
+        )
+        parser.add_argument(
+            '--warm',
+            action='store_true',
+            help='Не очищать кэш перед запросами'
+        )
+        parser.add_argument(
+            '--traces',
+            type=float,
+            help='Доля трассируемых Sentry запросов на время замера: '
+                 '0 — без трассировки, 1 — все; трассировки не отправляются'
+        )
+        parser.add_argument(
+            '--asgi',
+            action='store_true',
+            help='Запросы через ASGI с асинхронными представлениями; '
+                 'сравните p50 и p99 с запуском без ключа'
+        )
+        parser.add_argument('--baseline', default=benchmarks.BASELINE)
+        parser.add_argument(
+            '--update',
+            action='store_true',
+            help='Записать результаты как новый эталон'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=1.5,
+            help='Во сколько раз p95 может превысить эталон; 0 — не '
+                 'проверять задержку'
+        )
+
+    def handle(self, *args, **options):
+        results = benchmarks.run(
+            options['repeat'],
+            options['only'],
+            options['warm'],
+            options['traces'],
+            options['asgi']
+        )
+        self.stdout.write(
+            f"{'url':<22}" + ''.join(f'{column:>10}' for column in COLUMNS)
+        )
+        for name, result in results.items():
+            self.stdout.write(f'{name:<22}' + ''.join(
+                f'{result[column]:>10}' for column in COLUMNS
+            ))
+        if options['update']:
+            benchmarks.save_baseline(results, options['baseline'])
+            self.stdout.write(f"Эталон записан в {options['baseline']}")
+            return
+        failures = benchmarks.compare(
+            results,
+            benchmarks.load_baseline(options['baseline']),
+            options['tolerance']
+        )
+        if failures:
+            raise CommandError('\n'.join(failures))
+        self.stdout.write('Все страницы в пределах бюджета')
@@ -0,0 +1,284 @@
+import random
+import time
+from array import array
+from contextlib import contextmanager
+from datetime import timedelta
+from io import BytesIO
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from posts import (
+    counters, previews, search, thumbnails, timeline, uploads
+)
+from posts.models import Comment, Follow, Group, Post, User
+
+WORDS = (
+    'город утро кофе набережная дождь книга поезд друг море лес '
+    'работа выходные кот собака музыка фильм дорога окно снег лето '
+    'сегодня вчера долго быстро тихо красиво странно наконец снова '
+    'опять гулять читать писать думать смотреть ждать встретить'
+).split()
+
+
+def zipf_weights(count, exponent):
+    # Накопленные веса 1/k^s для random.choices(cum_weights=...):
+    # у первых элементов — большая доля выборок.
+    return array('d', accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """
+    Отключает auto_now_add, иначе bulk_create проставит текущее время.
+    """
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def synthetic_image(rng, width=1200, height=800):
+    background = tuple(rng.choices(range(256), k=3))
+    image = Image.new('RGB', (width, height), background)
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(width), rng.randrange(height)
+        size = rng.randrange(50, 400)
+        draw.ellipse(
+            (x, y, x + size, y + size),
+            fill=tuple(rng.choices(range(256), k=3))
+        )
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=85)
+    return ContentFile(buffer.getvalue(), name='synthetic.jpg')
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт нагрузочный набор данных: пользователей, группы, посты, '
+        'комментарии и подписки со степенным распределением'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=30000)
+        parser.add_argument(
+            '--follows',
+            type=float,
+            default=20,
+            help='Среднее число подписок у пользователя'
+        )
+        parser.add_argument(
+            '--images',
+            type=int,
+            default=0,
+            help='Сколько разных картинок сгенерировать для постов'
+        )
+        parser.add_argument(
+            '--image-share',
+            type=float,
+            default=0.2,
+            help='Доля постов с картинкой, если картинки есть'
+        )
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix',
+            default='load',
+            help='Начало имён пользователей и адресов групп'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.started = time.monotonic()
+        prefix = options['prefix']
+        # Даты отсчитываются от начала дня: от часа запуска не зависят.
+        self.end = timezone.now().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        self.start = self.end - timedelta(days=options['days'])
+
+        # sorl ищет миниатюры сначала в кэше: запись от другой базы
+        # не дала бы сохранить их в этой.
+        cache.clear()
+        user_ids = self.create_users(prefix, options['users'])
+        group_ids = self.create_groups(prefix, options['groups'])
+        images = self.create_images(options['images'])
+        post_ids = self.create_posts(
+            options['posts'], user_ids, group_ids,
+            images, options['image_share']
+        )
+        self.create_comments(options['comments'], user_ids, post_ids)
+        follow_ids = self.create_follows(options['follows'], user_ids)
+
+        # Новые посты и подписки касаются только новых пользователей.
+        if follow_ids:
+            self.report('ленты', timeline.rebuild(
+                Follow.objects.filter(id__gte=follow_ids[0])
+            ))
+        if user_ids:
+            self.report('счётчики', counters.reconcile(
+                User.objects.filter(id__gte=user_ids[0])
+            ))
+        search.rebuild()
+        self.report('поисковый индекс', len(post_ids))
+        # Закэшированные страницы и версии лент не знают о новых строках.
+        cache.clear()
+
+    def report(self, what, count):
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(f'{what}: {count} ({elapsed:.1f} с)')
+
+    def bulk_create(self, model, objects):
+        objects = iter(objects)
+        last_id = model.objects.aggregate(last=models.Max('id'))['last'] or 0
+        while True:
+            batch = list(islice(objects, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+        # Новые id идут подряд за последним; читаем их, а не объекты.
+        return array('q', model.objects.filter(id__gt=last_id).order_by(
+            'id'
+        ).values_list('id', flat=True).iterator())
+
+    def shuffled(self, ids):
+        ids = array('q', ids)
+        self.rng.shuffle(ids)
+        return ids
+
+    def pick(self, population, cum_weights):
+        return self.rng.choices(population, cum_weights=cum_weights)[0]
+
+    def text(self, low, high):
+        return ' '.join(
+            self.rng.choices(WORDS, k=self.rng.randint(low, high))
+        ).capitalize()
+
+    def date(self, index, count):
+        # Посты идут по времени в порядке id, как в живой базе.
+        span = (self.end - self.start).total_seconds()
+        return self.start + timedelta(seconds=span * (index + 1) / count)
+
+    def create_users(self, prefix, count):
+        password = make_password(None)
+        ids = self.bulk_create(User, (
+            User(username=f'{prefix}{number}', password=password)
+            for number in range(count)
+        ))
+        self.report('пользователи', len(ids))
+        return ids
+
+    def create_groups(self, prefix, count):
+        ids = self.bulk_create(Group, (
+            Group(
+                title=f'Группа {number}',
+                slug=f'{prefix}-group-{number}',
+                description=self.text(5, 20)
+            )
+            for number in range(count)
+        ))
+        self.report('группы', len(ids))
+        return ids
+
+    def create_images(self, count):
+        field = Post._meta.get_field('image')
+        images = []
+        for _ in range(count):
+            content = synthetic_image(self.rng)
+            name = uploads.ingest(content, field)
+            # Живые посты получают миниатюры сразу после загрузки.
+            thumbnails.generate(name)
+            content.seek(0)
+            images.append((name, *previews.describe(content)))
+        self.report('картинки', len(images))
+        return images
+
+    def create_posts(self, count, user_ids, group_ids, images, image_share):
+        authors = zipf_weights(len(user_ids), 1.1)
+        # Свой порядок популярности, иначе самые плодовитые авторы
+        # оказались бы и самыми читаемыми, а ленты — огромными.
+        user_ids = self.shuffled(user_ids)
+        groups = [None] * len(group_ids) + list(group_ids)
+
+        def posts():
+            for number in range(count):
+                post = Post(
+                    text=self.text(5, 60),
+                    author_id=self.pick(user_ids, authors),
+                    group_id=self.rng.choice(groups),
+                    pub_date=self.date(number, count)
+                )
+                if images and self.rng.random() < image_share:
+                    (post.image, post.image_width, post.image_height,
+                     post.image_placeholder) = self.rng.choice(images)
+                yield post
+
+        with explicit_dates(Post._meta.get_field('pub_date')):
+            ids = self.bulk_create(Post, posts())
+        self.report('посты', len(ids))
+        return ids
+
+    def create_comments(self, count, user_ids, post_ids):
+        if not post_ids:
+            return
+        # Популярные посты собирают большую часть комментариев.
+        popular = zipf_weights(len(post_ids), 0.8)
+        order = array('q', range(len(post_ids)))
+        self.rng.shuffle(order)
+
+        def comments():
+            for _ in range(count):
+                index = self.pick(order, popular)
+                created = self.date(index, len(post_ids)) + timedelta(
+                    minutes=self.rng.expovariate(1 / 60)
+                )
+                yield Comment(
+                    post_id=post_ids[index],
+                    author_id=self.rng.choice(user_ids),
+                    text=self.text(1, 25),
+                    created=min(created, self.end)
+                )
+
+        with explicit_dates(Comment._meta.get_field('created')):
+            ids = self.bulk_create(Comment, comments())
+        self.report('комментарии', len(ids))
+
+    def create_follows(self, average, user_ids):
+        # Число подписчиков автора распределено по степенному закону.
+        authors = zipf_weights(len(user_ids), 1.0)
+        popular = self.shuffled(user_ids)
+        limit = len(user_ids) - 1
+
+        def follows():
+            for user_id in user_ids:
+                wanted = min(limit, int(self.rng.expovariate(1 / average)))
+                # Повторы и подписка на себя отбрасываются, поэтому
+                # подписок бывает чуть меньше выбранного числа.
+                chosen = set(self.rng.choices(
+                    popular, cum_weights=authors, k=wanted
+                ))
+                chosen.discard(user_id)
+                for author_id in sorted(chosen):
+                    yield Follow(user_id=user_id, author_id=author_id)
+
+        ids = self.bulk_create(Follow, follows())
+        self.report('подписки', len(ids))
+        return ids
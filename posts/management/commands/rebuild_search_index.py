@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = 'Заново строит поисковый индекс по текстам постов'
+
+    def handle(self, *args, **options):
+        search.rebuild()
+        self.stdout.write('Поисковый индекс перестроен')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики записей и подписок пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames',
+            nargs='*',
+            help='Пользователи для пересчёта (по умолчанию все)'
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+        fixed = counters.reconcile(users)
+        self.stdout.write(f'Исправлено счётчиков: {fixed}')
@@ -0,0 +1,49 @@
+# Generated by Django 3.1.7 on 2026-10-18 03:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Post = apps.get_model('posts', 'Post')
+    Follow = apps.get_model('posts', 'Follow')
+    UserCounters = apps.get_model('posts', 'UserCounters')
+    quote = schema_editor.quote_name
+    posts = quote(Post._meta.db_table)
+    follows = quote(Follow._meta.db_table)
+    schema_editor.execute(
+        f'INSERT INTO {quote(UserCounters._meta.db_table)} '
+        f'(user_id, posts_count, followers_count, following_count) '
+        f'SELECT u.id, '
+        f'(SELECT COUNT(*) FROM {posts} p WHERE p.author_id = u.id), '
+        f'(SELECT COUNT(*) FROM {follows} f WHERE f.author_id = u.id), '
+        f'(SELECT COUNT(*) FROM {follows} f WHERE f.user_id = u.id) '
+        f'FROM {quote(User._meta.db_table)} u'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0006_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCounters',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='записей')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='подписок')),
+            ],
+            options={
+                'verbose_name': 'счётчики пользователя',
+                'verbose_name_plural': 'счётчики пользователей',
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 3.1.7 on 2026-10-18 03:34
+
+from django.db import migrations, models
+
+
+def remove_duplicate_follows(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    UserCounters = apps.get_model('posts', 'UserCounters')
+    keep = Follow.objects.values('user', 'author').annotate(
+        keep_id=models.Min('id')
+    ).values('keep_id')
+    deleted, _ = Follow.objects.exclude(id__in=keep).delete()
+    if not deleted:
+        return
+    quote = schema_editor.quote_name
+    counters = quote(UserCounters._meta.db_table)
+    follows = quote(Follow._meta.db_table)
+    schema_editor.execute(
+        f'UPDATE {counters} SET '
+        f'followers_count = (SELECT COUNT(*) FROM {follows} f '
+        f'WHERE f.author_id = {counters}.user_id), '
+        f'following_count = (SELECT COUNT(*) FROM {follows} f '
+        f'WHERE f.user_id = {counters}.user_id)'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_usercounters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', '-created', '-id'], name='comment_post_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='post_author_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-pub_date', '-id'], name='post_group_pub_date_idx'),
+        ),
+        migrations.RunPython(
+            remove_duplicate_follows,
+            migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='following_unique'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations
+
+TABLE = 'posts_post_search'
+CONFIG = 'russian'
+
+
+def create_search_index(apps, schema_editor):
+    # Без внешнего ключа: строки удаляют сигналы, а поиск всё равно
+    # соединяется с таблицей постов, так что лишние строки не видны.
+    Post = apps.get_model('posts', 'Post')
+    posts = schema_editor.quote_name(Post._meta.db_table)
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {TABLE} USING fts5('
+            f"text, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO {TABLE} (rowid, text) SELECT id, text FROM {posts}'
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE TABLE {TABLE} ('
+            f'post_id integer PRIMARY KEY, document tsvector NOT NULL)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX {TABLE}_document_idx '
+            f'ON {TABLE} USING gin (document)'
+        )
+        schema_editor.execute(
+            f'INSERT INTO {TABLE} (post_id, document) '
+            f'SELECT id, to_tsvector(%s, text) FROM {posts}',
+            [CONFIG]
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_image_metadata'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models.functions import Coalesce
 
 User = get_user_model()
 
@@ -17,6 +18,30 @@ class Group(models.Model):
         return self.title
 
 
+def comment_count(post_ref='pk'):
+    """
+    Число комментариев поста подзапросом: не требует GROUP BY по ленте
+    и вычисляется только для строк, попавших на страницу.
+    """
+    comments = Comment.objects.filter(
+        post=models.OuterRef(post_ref)
+    ).order_by().values('post').annotate(
+        count=models.Count('pk')
+    ).values('count')
+    return Coalesce(models.Subquery(comments), 0)
+
+
+class PostQuerySet(models.QuerySet):
+
+    def for_feed(self):
+        """
+        Посты с автором, группой и числом комментариев в одном запросе.
+        """
+        return self.select_related('author', 'group').annotate(
+            comment_count=comment_count()
+        )
+
+
 class Post(models.Model):
     text = models.TextField(
         help_text='Введите текст поста',
@@ -46,9 +71,43 @@ class Post(models.Model):
         null=True,
         help_text='Выберите картинку',
         verbose_name='Картинка')
+    # Заполняются при сохранении картинки, см. posts.previews
+    image_width = models.PositiveIntegerField(
+        'ширина картинки',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        'высота картинки',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    image_placeholder = models.TextField(
+        'превью картинки',
+        blank=True,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx'
+            ),
+        ]
         verbose_name = 'пост'
         verbose_name_plural = 'посты'
 
@@ -80,6 +139,17 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('-created',)
+        indexes = [
+            models.Index(
+                fields=['post', '-created', '-id'],
+                name='comment_post_created_idx'
+            ),
+            # Список комментариев в админке и фильтр по дате.
+            models.Index(
+                fields=['-created', '-id'],
+                name='comment_created_idx'
+            ),
+        ]
         verbose_name = 'комментарий'
         verbose_name_plural = 'комментарии'
 
@@ -97,13 +167,77 @@ class Follow(models.Model):
     )
 
     class Meta:
-        models.UniqueConstraint(
-            fields=['author', 'user'],
-            name='following_unique'
-        )
-
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='following_unique'
+            ),
+        ]
         verbose_name = 'подписка'
         verbose_name_plural = 'подписки'
 
     def __str__(self):
         return f'{self.user} - подписчик автора - {self.author}'
+
+
+class UserCounters(models.Model):
+    user = models.OneToOneField(
+        User,
+        primary_key=True,
+        related_name='counters',
+        on_delete=models.CASCADE
+    )
+    posts_count = models.PositiveIntegerField('записей', default=0)
+    followers_count = models.PositiveIntegerField('подписчиков', default=0)
+    following_count = models.PositiveIntegerField('подписок', default=0)
+
+    class Meta:
+        verbose_name = 'счётчики пользователя'
+        verbose_name_plural = 'счётчики пользователей'
+
+    def __str__(self):
+        return f'{self.user_id}: {self.posts_count} записей'
+
+
+class TimelineEntryQuerySet(models.QuerySet):
+
+    def for_feed(self):
+        return self.select_related('post__author', 'post__group').annotate(
+            comment_count=comment_count('post_id')
+        )
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        related_name='timeline',
+        on_delete=models.CASCADE
+    )
+    post = models.ForeignKey(
+        Post,
+        related_name='timeline_entries',
+        on_delete=models.CASCADE
+    )
+    pub_date = models.DateTimeField('date published')
+
+    objects = TimelineEntryQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('-pub_date',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='timeline_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_pub_date_idx'
+            ),
+        ]
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'записи ленты'
+
+    def __str__(self):
+        return f'{self.user} - лента - {self.post_id}'
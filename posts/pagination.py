@@ -0,0 +1,43 @@
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .paginators import CursorPaginator
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничный вывод API через CursorPaginator — те же курсоры
+    after/before, что и в HTML-лентах. Порядок задаёт атрибут
+    ordering представления.
+    """
+    page_size = api_settings.PAGE_SIZE or 10
+    ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = CursorPaginator(
+            queryset,
+            self.page_size,
+            ordering=getattr(view, 'ordering', self.ordering)
+        )
+        self.page = paginator.get_page(
+            request.query_params.get('after'),
+            request.query_params.get('before')
+        )
+        return list(self.page.object_list)
+
+    def _link(self, param, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(remove_query_param(url, 'after'), 'before')
+        return replace_query_param(url, param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self._link('after', self.page.next_cursor),
+            'previous': self._link('before', self.page.previous_cursor),
+            'results': data,
+        })
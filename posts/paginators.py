@@ -0,0 +1,204 @@
+import base64
+import collections.abc
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage(collections.abc.Sequence):
+
+    def __init__(self, object_list, paginator, previous_cursor=None,
+                 next_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.previous_cursor = previous_cursor
+        self.next_cursor = next_cursor
+
+    def __repr__(self):
+        return f'<CursorPage {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+
+class CursorPaginator:
+    """
+    Постраничный вывод по ключу сортировки (по умолчанию pub_date, id).
+    Не выполняет COUNT и OFFSET: каждая страница — это диапазонный запрос
+    по индексу, начиная с курсора соседней страницы.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = [name.startswith('-') for name in self.ordering]
+
+    def encode_cursor(self, obj):
+        values = []
+        for field in self.fields:
+            value = getattr(obj, field)
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            values.append(str(value))
+        raw = '|'.join(values).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = base64.urlsafe_b64decode(padded.encode()).decode()
+            values = values.split('|')
+        except (TypeError, ValueError):
+            raise InvalidCursor(cursor)
+        if len(values) != len(self.fields):
+            raise InvalidCursor(cursor)
+        try:
+            return [
+                self._output_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except ValidationError:
+            raise InvalidCursor(cursor)
+
+    def _output_field(self, name):
+        # Сортировать можно и по аннотации, например по рангу поиска.
+        annotation = self.object_list.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.object_list.model._meta.get_field(name)
+
+    def _seek(self, values, forward):
+        """
+        Условие «строго после курсора» в порядке сортировки (forward)
+        или «строго до курсора» (not forward).
+        """
+        condition = Q()
+        for position in reversed(range(len(self.fields))):
+            field = self.fields[position]
+            descending = self.descending[position]
+            lookup = 'lt' if descending == forward else 'gt'
+            step = Q(**{f'{field}__{lookup}': values[position]})
+            if position < len(self.fields) - 1:
+                step |= Q(**{field: values[position]}) & condition
+            condition = step
+        return condition
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        ]
+
+    def page(self, after=None, before=None):
+        """
+        Страница, следующая за курсором after (более старые записи)
+        или предшествующая курсору before (более новые записи).
+        """
+        queryset = self.object_list
+        if before is not None:
+            values = self.decode_cursor(before)
+            rows = list(
+                queryset.filter(self._seek(values, forward=False))
+                .order_by(*self._reversed_ordering())[:self.per_page + 1]
+            )
+            if not rows:
+                return self.page()
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            if after is not None:
+                values = self.decode_cursor(after)
+                queryset = queryset.filter(self._seek(values, forward=True))
+            rows = list(
+                queryset.order_by(*self.ordering)[:self.per_page + 1]
+            )
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_previous = after is not None
+        if not rows:
+            return CursorPage(rows, self)
+        return CursorPage(
+            rows,
+            self,
+            previous_cursor=(
+                self.encode_cursor(rows[0]) if has_previous else None
+            ),
+            next_cursor=self.encode_cursor(rows[-1]) if has_next else None,
+        )
+
+    def get_page(self, after=None, before=None):
+        """
+        Как page(), но при испорченном курсоре возвращает первую страницу.
+        """
+        try:
+            return self.page(after=after or None, before=before or None)
+        except InvalidCursor:
+            return self.page()
+
+
+def estimate_count(queryset):
+    """
+    Примерное число строк в таблице модели без COUNT(*):
+    статистика планировщика PostgreSQL или максимальный id в SQLite.
+    None, если оценить нельзя.
+    """
+    connection = connections[queryset.db]
+    opts = queryset.model._meta
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class '
+                'WHERE oid = %s::regclass',
+                [opts.db_table]
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f'SELECT MAX({connection.ops.quote_name(opts.pk.column)}) '
+                f'FROM {connection.ops.quote_name(opts.db_table)}'
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Для неотфильтрованной большой таблицы число строк берётся из оценки
+    вместо COUNT(*) по всей таблице. Небольшие таблицы и отфильтрованные
+    списки считаются точно.
+    """
+    exact_below = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if hasattr(queryset, 'query') and not queryset.query.where:
+            estimate = estimate_count(queryset)
+            if estimate is not None and estimate >= self.exact_below:
+                return estimate
+        return super().count
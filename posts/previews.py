@@ -0,0 +1,66 @@
+"""
+Размеры картинки поста и крошечное превью для заглушки.
+
+Всё вычисляется один раз при сохранении картинки и хранится в полях
+поста, так что при отрисовке карточки файл не открывается.
+"""
+import base64
+import logging
+from io import BytesIO
+
+from PIL import Image, features
+
+logger = logging.getLogger(__name__)
+
+# Превью не больше 16x16 с пропорциями картинки, растягивается
+# и размывается в CSS.
+PLACEHOLDER_SIZE = (16, 16)
+PLACEHOLDER_FORMAT = 'WEBP' if features.check('webp') else 'JPEG'
+
+
+def describe(file):
+    """
+    Ширина, высота и data URI превью для открытого файла картинки.
+    """
+    with Image.open(file) as image:
+        width, height = image.size
+        # Для JPEG декодируется уменьшенная копия.
+        image.draft('RGB', PLACEHOLDER_SIZE)
+        preview = image.convert('RGB')
+    preview.thumbnail(PLACEHOLDER_SIZE)
+    buffer = BytesIO()
+    preview.save(buffer, PLACEHOLDER_FORMAT, quality=30)
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return (
+        width,
+        height,
+        f'data:image/{PLACEHOLDER_FORMAT.lower()};base64,{encoded}'
+    )
+
+
+def describe_image(image):
+    """
+    describe() для поля картинки; None, если файл не читается.
+    """
+    close = image.closed
+    try:
+        image.open()
+        return describe(image)
+    except Exception:
+        logger.warning('Не удалось прочитать картинку %s', image.name)
+        return None
+    finally:
+        if close:
+            image.close()
+        elif not image.closed:
+            image.seek(0)
+
+
+def fill(post):
+    """
+    Заполняет поля размеров и превью картинки поста.
+    """
+    described = describe_image(post.image) if post.image else None
+    if described is None:
+        described = (None, None, '')
+    post.image_width, post.image_height, post.image_placeholder = described
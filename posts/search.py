@@ -0,0 +1,125 @@
+"""
+Полнотекстовый поиск по текстам постов.
+
+Индекс — отдельная таблица posts_post_search:
+  SQLite — виртуальная таблица FTS5, rowid совпадает с id поста;
+  PostgreSQL — post_id и tsvector с GIN-индексом.
+Таблицу создаёт миграция 0010, обновляют сигналы сохранения
+и удаления поста. Для других СУБД поиск сводится к icontains.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+
+TABLE = 'posts_post_search'
+CONFIG = 'russian'
+WORDS = re.compile(r'\w+')
+
+
+def _vendor():
+    return connection.vendor
+
+
+def index(post):
+    """
+    Добавляет пост в индекс или обновляет его текст.
+    """
+    with connection.cursor() as cursor:
+        if _vendor() == 'sqlite':
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [post.pk])
+            cursor.execute(
+                f'INSERT INTO {TABLE} (rowid, text) VALUES (%s, %s)',
+                [post.pk, post.text]
+            )
+        elif _vendor() == 'postgresql':
+            cursor.execute(
+                f'INSERT INTO {TABLE} (post_id, document) '
+                f'VALUES (%s, to_tsvector(%s, %s)) '
+                f'ON CONFLICT (post_id) '
+                f'DO UPDATE SET document = EXCLUDED.document',
+                [post.pk, CONFIG, post.text]
+            )
+
+
+def unindex(post_id):
+    with connection.cursor() as cursor:
+        if _vendor() == 'sqlite':
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [post_id])
+        elif _vendor() == 'postgresql':
+            cursor.execute(
+                f'DELETE FROM {TABLE} WHERE post_id = %s', [post_id]
+            )
+
+
+def rebuild():
+    """
+    Заново строит индекс по всем постам, например после bulk_create.
+    """
+    posts = Post._meta.db_table
+    with connection.cursor() as cursor:
+        if _vendor() == 'sqlite':
+            cursor.execute(f'DELETE FROM {TABLE}')
+            cursor.execute(
+                f'INSERT INTO {TABLE} (rowid, text) '
+                f'SELECT id, text FROM {posts}'
+            )
+        elif _vendor() == 'postgresql':
+            cursor.execute(f'TRUNCATE {TABLE}')
+            cursor.execute(
+                f'INSERT INTO {TABLE} (post_id, document) '
+                f'SELECT id, to_tsvector(%s, text) FROM {posts}',
+                [CONFIG]
+            )
+
+
+def search(query, queryset=None):
+    """
+    Посты, в которых есть все слова запроса (слово может быть началом
+    более длинного), с аннотацией rank: чем меньше, тем релевантнее.
+
+    Курсор страницы хранит rank, а он не постоянен: bm25 в SQLite
+    зависит от всего индекса, ts_rank — от текста поста. Если после
+    выдачи курсора посты добавили или изменили, следующая страница
+    может пропустить или повторить несколько результатов.
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    words = WORDS.findall(query.lower())
+    if not words:
+        return queryset.none().annotate(
+            rank=Value(0.0, output_field=FloatField())
+        )
+    posts = Post._meta.db_table
+    if _vendor() == 'sqlite':
+        match = ' '.join(f'"{word}"*' for word in words)
+        return queryset.extra(
+            tables=[TABLE],
+            where=[f'{TABLE}.rowid = {posts}.id', f'{TABLE} MATCH %s'],
+            params=[match]
+        ).annotate(rank=RawSQL(
+            f'bm25({TABLE})', [], output_field=FloatField()
+        ))
+    if _vendor() == 'postgresql':
+        tsquery = ' & '.join(f'{word}:*' for word in words)
+        return queryset.extra(
+            tables=[TABLE],
+            where=[
+                f'{TABLE}.post_id = {posts}.id',
+                f'{TABLE}.document @@ to_tsquery(%s, %s)',
+            ],
+            params=[CONFIG, tsquery]
+        ).annotate(rank=RawSQL(
+            # ts_rank возвращает real, а курсор хранит float Python:
+            # без приведения строка на границе страницы теряется.
+            f'-ts_rank({TABLE}.document, to_tsquery(%s, %s))'
+            f'::double precision',
+            [CONFIG, tsquery],
+            output_field=FloatField()
+        ))
+    for word in words:
+        queryset = queryset.filter(text__icontains=word)
+    return queryset.annotate(rank=Value(0.0, output_field=FloatField()))
@@ -0,0 +1,72 @@
+from rest_framework import serializers
+
+from .models import Post, Group, Comment, Follow
+
+
+class SparseFieldsMixin:
+    """
+    ?fields=id,text — в ответе только перечисленные поля.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        fields = request and request.query_params.get('fields')
+        if fields:
+            wanted = set(fields.split(','))
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+
+    def model_paths(self):
+        """
+        Пути полей модели (author__username), из которых читаются
+        оставшиеся поля ответа; для .only() в SparseFieldsViewMixin.
+        """
+        paths = []
+        for field in self.fields.values():
+            if field.source == '*':
+                continue
+            path = field.source.replace('.', '__')
+            slug_field = getattr(field, 'slug_field', None)
+            if slug_field:
+                path = f'{path}__{slug_field}'
+            paths.append(path)
+        return paths
+
+
+class PostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # Автор и группа приходят из select_related в for_feed().
+    author = serializers.ReadOnlyField(source='author.username')
+    group = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+    comment_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Post
+        fields = (
+            'id', 'text', 'author', 'group', 'pub_date', 'image',
+            'image_width', 'image_height', 'comment_count',
+        )
+
+
+class GroupSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+
+    class Meta:
+        model = Group
+        fields = ('id', 'title', 'slug', 'description')
+
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    author = serializers.ReadOnlyField(source='author.username')
+
+    class Meta:
+        model = Comment
+        fields = ('id', 'post', 'author', 'text', 'created')
+
+
+class FollowSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    user = serializers.ReadOnlyField(source='user.username')
+    author = serializers.ReadOnlyField(source='author.username')
+
+    class Meta:
+        model = Follow
+        fields = ('id', 'user', 'author')
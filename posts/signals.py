@@ -0,0 +1,114 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.core.cache import cache
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import (
+    authentication, caching, counters, previews, search, thumbnails, timeline
+)
+from .models import Comment, Follow, Post, User
+
+# Поля пользователя, от которых зависит вход по токену API.
+AUTH_FIELDS = frozenset({'is_active', 'password'})
+
+
+def image_changed(post):
+    return (post.image.name or '') != (getattr(post, '_old_image', '') or '')
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.pk is not None:
+        old = Post.objects.filter(pk=instance.pk).values_list(
+            'group__slug', 'image'
+        ).first()
+        if old is not None:
+            instance._old_group_slug, instance._old_image = old
+    if image_changed(instance):
+        previews.fill(instance)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        counters.increment(instance.author_id, 'posts_count')
+        timeline.fan_out(instance)
+    if image_changed(instance):
+        thumbnails.schedule(instance)
+    search.index(instance)
+    caching.post_changed(
+        instance,
+        getattr(instance, '_old_group_slug', None)
+    )
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.decrement(instance.author_id, 'posts_count')
+    search.unindex(instance.pk)
+    caching.post_changed(instance)
+
+
+def loaded_post(comment):
+    """
+    Пост комментария с автором и группой. add_comment передаёт его
+    уже загруженным; иначе это один запрос.
+    """
+    if Comment.post.is_cached(comment):
+        post = comment.post
+        if Post.author.is_cached(post) and (
+            post.group_id is None or Post.group.is_cached(post)
+        ):
+            return post
+    return Post.objects.select_related('author', 'group').filter(
+        pk=comment.post_id
+    ).first()
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    post = loaded_post(instance)
+    if post is not None:
+        caching.post_changed(post)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.increment(instance.author_id, 'followers_count')
+        counters.increment(instance.user_id, 'following_count')
+        timeline.backfill(instance.user, instance.author)
+        caching.follow_changed(instance.user, instance.author)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.decrement(instance.author_id, 'followers_count')
+    counters.decrement(instance.user_id, 'following_count')
+    timeline.prune(instance.user, instance.author)
+    caching.follow_changed(instance.user, instance.author)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    cache.delete(authentication.token_cache_key(instance.key))
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, update_fields=None,
+               **kwargs):
+    # Закэшированный для API пользователь устарел, только если могли
+    # измениться is_active или пароль. Вход (update_fields=last_login)
+    # кэш не сбрасывает.
+    if created or raw:
+        return
+    if update_fields is None \
+            or not AUTH_FIELDS.isdisjoint(update_fields):
+        authentication.forget_tokens(instance)
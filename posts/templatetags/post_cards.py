@@ -0,0 +1,60 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from posts.caching import card_key
+
+register = template.Library()
+
+# Место для кнопки «Редактировать»: она зависит от пользователя
+# и подставляется в уже закэшированную карточку.
+EDIT_HOLE = mark_safe('<!-- post-edit -->')
+
+
+def edit_link(post):
+    return format_html(
+        '<a class="btn btn-sm text-muted" href="{}" role="button">'
+        'Редактировать</a>',
+        reverse('post_edit', args=[post.author.username, post.id])
+    )
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts, hide=False):
+    """
+    Карточки постов ленты: готовые берутся из кэша одним get_many,
+    недостающие отрисовываются и сохраняются — кроме тех, чьи миниатюры
+    ещё не готовы.
+    """
+    posts = list(posts)
+    keys = {post.pk: card_key(post, hide) for post in posts}
+    cards = cache.get_many(list(keys.values()))
+    missing = {}
+    for post in posts:
+        key = keys[post.pk]
+        if key not in cards:
+            cards[key] = render_to_string(
+                'post_frame.html',
+                {'post': post, 'hide': hide, 'edit_hole': EDIT_HOLE}
+            )
+            if not getattr(post, 'thumbnails_pending', False):
+                missing[key] = cards[key]
+    if missing:
+        cache.set_many(missing, settings.FEED_CACHE_TIMEOUT)
+    user = context.get('user')
+    html = []
+    for post in posts:
+        hole = ''
+        if user is not None and user.pk == post.author_id:
+            hole = edit_link(post)
+        html.append(cards[keys[post.pk]].replace(EDIT_HOLE, hole))
+    return mark_safe(''.join(html))
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post, hide=False):
+    return post_cards(context, [post], hide)
@@ -0,0 +1,63 @@
+import logging
+
+from django import template
+
+from posts import thumbnails
+
+logger = logging.getLogger(__name__)
+register = template.Library()
+
+
+def _srcset(image, variants):
+    """
+    srcset из готовых миниатюр или None, если хоть одной нет.
+    """
+    candidates = []
+    for width, geometry, options in variants:
+        thumbnail = thumbnails.cached(image, geometry, options)
+        if thumbnail is None:
+            return None
+        candidates.append(f'{thumbnail.url} {width}w')
+    return ', '.join(candidates)
+
+
+@register.inclusion_tag('post_picture.html')
+def post_picture(post):
+    """
+    <picture> с набором ширин в современных форматах и JPEG
+    для браузеров, которые их не поддерживают. Размеры <img> и его
+    пропорции — из сохранённых полей поста. Миниатюры только
+    ищутся в хранилище ключей sorl; пока фоновый воркер их не создал,
+    показывается исходная картинка поверх заглушки.
+    """
+    image = post.image
+    try:
+        fallback = thumbnails.cached(image, *thumbnails.FALLBACK)
+        sources = []
+        for image_format, variants in thumbnails.VARIANTS.items():
+            srcset = _srcset(image, variants)
+            if srcset is None:
+                fallback = None
+                break
+            sources.append({
+                'type': f'image/{image_format.lower()}',
+                'srcset': srcset,
+            })
+        if fallback is None:
+            thumbnails.ensure(image)
+            sources = []
+            # post_cards не сохранит карточку с исходной картинкой.
+            post.thumbnails_pending = True
+        src = fallback.url if fallback is not None else image.url
+    except Exception:
+        # Как и тег {% thumbnail %}: битая картинка не ломает страницу.
+        logger.exception('Не удалось получить миниатюры %s', image.name)
+        return {}
+    return {
+        'src': src,
+        'sources': sources,
+        'card_width': thumbnails.WIDTH,
+        'width': post.image_width,
+        'height': post.image_height,
+        'placeholder': post.image_placeholder,
+    }
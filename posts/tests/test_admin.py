@@ -0,0 +1,122 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Post, User, Group, Comment, Follow
+from posts.paginators import EstimatedCountPaginator
+from posts.tests.test_indexes import plan, problems
+
+ADMIN_USERNAME = 'admin'
+POST_TEXT = 'Текст публикации'
+
+
+class AdminQueryCountTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.ADMIN = User.objects.create_superuser(
+            username=ADMIN_USERNAME,
+            email='admin@example.com',
+            password='password'
+        )
+        cls.GROUP = Group.objects.create(
+            title='testgroup',
+            description='test description',
+            slug='group'
+        )
+        cls.admin_client = Client()
+        cls.admin_client.force_login(cls.ADMIN)
+
+    def add_rows(self, count):
+        for number in range(count):
+            author = User.objects.create_user(
+                username=f'user{User.objects.count()}'
+            )
+            post = Post.objects.create(
+                author=author,
+                text=POST_TEXT,
+                group=self.GROUP
+            )
+            Comment.objects.create(post=post, author=author, text=POST_TEXT)
+            Follow.objects.create(user=author, author=self.ADMIN)
+        return post
+
+    def pages(self, post):
+        return [
+            reverse('admin:posts_post_changelist'),
+            reverse('admin:posts_comment_changelist'),
+            reverse('admin:posts_follow_changelist'),
+            reverse('admin:posts_post_changelist') + '?q=текст',
+            reverse('admin:posts_comment_changelist') + '?q=user',
+            reverse('admin:posts_post_change', args=[post.id]),
+            reverse('admin:posts_comment_change',
+                    args=[post.comments.get().id]),
+            reverse('admin:posts_follow_change',
+                    args=[post.author.follower.get().id]),
+        ]
+
+    def count_queries(self, url):
+        # Первый запрос прогревает сессию и кэши.
+        self.admin_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.admin_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_rows(self):
+        post = self.add_rows(1)
+        single = {url: self.count_queries(url) for url in self.pages(post)}
+        self.add_rows(10)
+        for url, count in single.items():
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), count)
+
+    def test_change_form_does_not_list_all_users(self):
+        post = self.add_rows(3)
+        response = self.admin_client.get(
+            reverse('admin:posts_post_change', args=[post.id])
+        )
+        self.assertNotContains(response, 'user0')
+
+    def test_large_table_count_is_estimated(self):
+        self.add_rows(3)
+        with mock.patch.object(EstimatedCountPaginator, 'exact_below', 0):
+            with CaptureQueriesContext(connection) as queries:
+                self.admin_client.get(
+                    reverse('admin:posts_post_changelist')
+                )
+        self.assertFalse([
+            query for query in queries
+            if 'COUNT(' in query['sql'] and 'posts_post' in query['sql']
+        ])
+
+    def test_comment_date_hierarchy_uses_index(self):
+        """
+        Список комментариев, его сортировка и переходы по датам идут
+        по comment_created_idx, а не по всей таблице.
+        """
+        self.add_rows(3)
+        today = timezone.localdate()
+        changelist = reverse('admin:posts_comment_changelist')
+        urls = [
+            changelist,
+            f'{changelist}?created__year={today.year}',
+            f'{changelist}?created__year={today.year}'
+            f'&created__month={today.month}&created__day={today.day}',
+        ]
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                self.admin_client.get(url)
+            for query in queries:
+                sql = query['sql']
+                # Даты навигации группируются по выбранному диапазону.
+                if not sql.startswith('SELECT') or 'DISTINCT' in sql \
+                        or 'posts_comment' not in sql:
+                    continue
+                with self.subTest(url=url, sql=sql):
+                    self.assertEqual(problems(plan(sql)), [])
@@ -0,0 +1,181 @@
+from django.contrib.auth.models import update_last_login
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from posts.models import Post, User, Group, Comment, Follow
+
+AUTHOR_USERNAME = 'author'
+READER_USERNAME = 'reader'
+SLUG = 'group'
+POSTS_COUNT = 15
+
+POSTS_URL = reverse('api-posts-list')
+GROUPS_URL = reverse('api-groups-list')
+FEED_URL = reverse('api-feed')
+TOKEN_URL = reverse('api-token')
+FOLLOWING_URL = reverse('api-following', args=[READER_USERNAME])
+FOLLOWERS_URL = reverse('api-followers', args=[AUTHOR_USERNAME])
+
+
+class ApiTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.AUTHOR = User.objects.create_user(username=AUTHOR_USERNAME)
+        cls.READER = User.objects.create_user(
+            username=READER_USERNAME,
+            password='password'
+        )
+        cls.GROUP = Group.objects.create(
+            title='testgroup',
+            description='test description',
+            slug=SLUG
+        )
+        Follow.objects.create(user=cls.READER, author=cls.AUTHOR)
+        cls.POSTS = [
+            Post.objects.create(
+                author=cls.AUTHOR,
+                text=f'Пост {number}',
+                group=None if number % 2 else cls.GROUP
+            )
+            for number in range(POSTS_COUNT)
+        ]
+        cls.POST = cls.POSTS[-1]
+        cls.COMMENTS_URL = reverse('api-post-comments', args=[cls.POST.id])
+        cls.TOKEN = Token.objects.create(user=cls.READER)
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.credentials(HTTP_AUTHORIZATION=f'Token {self.TOKEN.key}')
+
+    def walk(self, url):
+        ids = []
+        while url:
+            data = self.api.get(url).json()
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+        return ids
+
+    def test_requires_token(self):
+        self.assertEqual(APIClient().get(POSTS_URL).status_code, 401)
+
+    def test_token_endpoint(self):
+        response = APIClient().post(
+            TOKEN_URL,
+            {'username': READER_USERNAME, 'password': 'password'}
+        )
+        self.assertEqual(response.json(), {'token': self.TOKEN.key})
+
+    def test_posts_cursor_walk(self):
+        expected = [post.id for post in reversed(self.POSTS)]
+        self.assertEqual(self.walk(POSTS_URL), expected)
+        self.assertEqual(self.walk(FEED_URL), expected)
+        self.assertEqual(
+            self.walk(f'{POSTS_URL}?group={SLUG}'),
+            [post.id for post in reversed(self.POSTS) if post.group_id]
+        )
+
+    def test_previous_link(self):
+        first = self.api.get(POSTS_URL).json()
+        second = self.api.get(first['next']).json()
+        self.assertEqual(
+            self.api.get(second['previous']).json()['results'],
+            first['results']
+        )
+
+    def test_post_detail_and_sparse_fields(self):
+        Comment.objects.create(post=self.POST, author=self.READER, text='1')
+        data = self.api.get(
+            reverse('api-posts-detail', args=[self.POST.id])
+        ).json()
+        self.assertEqual(data['author'], AUTHOR_USERNAME)
+        self.assertEqual(data['group'], SLUG)
+        self.assertEqual(data['comment_count'], 1)
+        data = self.api.get(POSTS_URL, {'fields': 'id,text'}).json()
+        self.assertEqual(set(data['results'][0]), {'id', 'text'})
+
+    def test_sparse_fields_narrow_the_query(self):
+        for url, fields in (
+            (POSTS_URL, 'id,author'),
+            (FEED_URL, 'id,author'),
+            (self.COMMENTS_URL, 'id,post'),
+            (FOLLOWERS_URL, 'id,user'),
+            (GROUPS_URL, 'slug'),
+        ):
+            with self.subTest(url=url):
+                full = self.api.get(url).json()['results']
+                with CaptureQueriesContext(connection) as queries:
+                    sparse = self.api.get(url, {'fields': fields}).json()
+                names = fields.split(',')
+                self.assertEqual(
+                    sparse['results'],
+                    [{name: item[name] for name in names} for item in full]
+                )
+                sql = queries[-1]['sql']
+                self.assertNotIn('"text"', sql)
+                self.assertNotIn('"description"', sql)
+                self.assertNotIn('"email"', sql)
+
+    def test_sparse_fields_query_count(self):
+        for url, fields in (
+            (POSTS_URL, 'id,text'),
+            (POSTS_URL, 'comment_count'),
+            (FEED_URL, 'id,text'),
+            (FEED_URL, 'comment_count'),
+        ):
+            self.api.get(url, {'fields': fields})
+            with self.subTest(url=url, fields=fields), \
+                    self.assertNumQueries(1):
+                self.api.get(url, {'fields': fields})
+
+    def test_comments_groups_and_follows(self):
+        comment = Comment.objects.create(
+            post=self.POST,
+            author=self.READER,
+            text='Комментарий'
+        )
+        self.assertEqual(self.walk(self.COMMENTS_URL), [comment.id])
+        self.assertEqual(
+            self.api.get(reverse('api-groups-detail', args=[SLUG]))
+            .json()['title'],
+            self.GROUP.title
+        )
+        self.assertEqual(self.walk(GROUPS_URL), [self.GROUP.id])
+        for url in FOLLOWING_URL, FOLLOWERS_URL:
+            with self.subTest(url=url):
+                results = self.api.get(url).json()['results']
+                self.assertEqual(
+                    [(item['user'], item['author']) for item in results],
+                    [(READER_USERNAME, AUTHOR_USERNAME)]
+                )
+
+    def test_list_query_count(self):
+        for url in POSTS_URL, FEED_URL, self.COMMENTS_URL, FOLLOWERS_URL:
+            self.api.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                self.api.get(url)
+            with self.subTest(url=url):
+                self.assertLessEqual(len(queries), 2)
+
+    def test_token_lookup_is_cached_and_invalidated(self):
+        self.api.get(GROUPS_URL)
+        with CaptureQueriesContext(connection) as queries:
+            self.api.get(GROUPS_URL)
+        self.assertFalse(
+            [query for query in queries if 'authtoken' in query['sql']]
+        )
+        # Вход обновляет только last_login и кэш не сбрасывает.
+        update_last_login(None, self.READER)
+        with CaptureQueriesContext(connection) as queries:
+            self.api.get(GROUPS_URL)
+        self.assertFalse(
+            [query for query in queries if 'authtoken' in query['sql']]
+        )
+        self.READER.is_active = False
+        self.READER.save(update_fields=['is_active'])
+        self.assertEqual(self.api.get(GROUPS_URL).status_code, 401)
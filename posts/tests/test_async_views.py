@@ -0,0 +1,147 @@
+import asyncio
+import os
+import re
+import threading
+from unittest import mock
+
+from asgiref.sync import SyncToAsync, async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+from yatube import aio
+
+AUTHOR_USERNAME = 'author'
+READER_USERNAME = 'reader'
+SLUG = 'group'
+
+INDEX = reverse('index')
+FOLLOW_INDEX = reverse('follow_index')
+GROUP_POSTS = reverse('group_posts', args=[SLUG])
+PROFILE = reverse('profile', args=[AUTHOR_USERNAME])
+LOGIN = reverse('login')
+CSRF = re.compile(r'name="csrfmiddlewaretoken" value="[^"]+"')
+
+
+# Запросы к базе идут из потоков пула, поэтому данные фиксируются.
+@override_settings(ROOT_URLCONF='yatube.asgi_urls')
+class AsyncViewsTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username=AUTHOR_USERNAME)
+        reader = User.objects.create_user(username=READER_USERNAME)
+        group = Group.objects.create(title='Группа', slug=SLUG)
+        self.post = Post.objects.create(
+            author=self.author,
+            group=group,
+            text='Текст публикации'
+        )
+        Comment.objects.create(
+            post=self.post,
+            author=reader,
+            text='Текст комментария'
+        )
+        Follow.objects.create(user=reader, author=self.author)
+        self.client.force_login(reader)
+        self.async_client.force_login(reader)
+        self.post_url = reverse('post', args=[AUTHOR_USERNAME, self.post.id])
+
+    def get(self, url, **headers):
+        async def get():
+            return await self.async_client.get(url, **headers)
+        return async_to_sync(get)()
+
+    def test_pages_match_sync_views(self):
+        urls = [INDEX, FOLLOW_INDEX, GROUP_POSTS, PROFILE, self.post_url]
+        for url in urls:
+            with self.subTest(url=url):
+                with self.settings(ROOT_URLCONF='yatube.urls'):
+                    expected = self.client.get(url)
+                cache.clear()
+                response = self.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(asyncio.iscoroutinefunction(
+                    response.resolver_match.func
+                ))
+                self.assertEqual(
+                    CSRF.sub('', response.content.decode()),
+                    CSRF.sub('', expected.content.decode())
+                )
+
+    def test_missing_objects(self):
+        urls = [
+            reverse('profile', args=['nobody']),
+            reverse('group_posts', args=['nothing']),
+            reverse('post', args=[READER_USERNAME, self.post.id]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.get(url).status_code, 404)
+
+    def test_follow_index_requires_login(self):
+        self.async_client.logout()
+        response = self.get(FOLLOW_INDEX)
+        self.assertRedirects(
+            response,
+            f'{LOGIN}?next={FOLLOW_INDEX}',
+            fetch_redirect_response=False
+        )
+
+    def test_conditional_get(self):
+        etag = self.get(PROFILE)['ETag']
+        response = self.get(PROFILE, **{'if-none-match': etag})
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(author=self.author, text='Новый пост')
+        response = self.get(PROFILE, **{'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_calls_run_concurrently(self):
+        # Оба вызова ждут друг друга: последовательно они не завершатся.
+        barrier = threading.Barrier(2, timeout=5)
+
+        async def both():
+            await asyncio.gather(aio.run(barrier.wait), aio.run(barrier.wait))
+        async_to_sync(both)()
+
+    def test_middleware_chain_is_adapted_once(self):
+        # Синхронный ReplicaMiddleware в конце цепочки: стандартные
+        # middleware выполняются в одном потоке, а не через
+        # sync_to_async на каждый хук.
+        hops = []
+        call = SyncToAsync.__call__
+
+        async def counted(adapter, *args, **kwargs):
+            hops.append(adapter.func)
+            return await call(adapter, *args, **kwargs)
+
+        with mock.patch.object(SyncToAsync, '__call__', counted):
+            self.assertEqual(self.get(INDEX).status_code, 200)
+        self.assertLess(len(hops), len(settings.MIDDLEWARE))
+
+    @override_settings(SERVER_TIMING=True)
+    def test_metrics_count_work_in_pool_threads(self):
+        header = self.get(INDEX)['Server-Timing']
+        queries = re.search(r'db;desc="(\d+) SQL"', header).group(1)
+        self.assertGreater(int(queries), 0)
+        lookups = re.findall(r'(?:l1|l2|miss)=(\d+)', header)
+        self.assertGreater(sum(map(int, lookups)), 0)
+
+    def test_asgi_application(self):
+        with mock.patch.dict(os.environ):
+            from yatube.asgi import application
+
+        async def request():
+            communicator = ApplicationCommunicator(application, {
+                'type': 'http',
+                'method': 'GET',
+                'path': PROFILE,
+                'query_string': b'',
+                'headers': [(b'host', b'testserver')],
+            })
+            await communicator.send_input({'type': 'http.request'})
+            return await communicator.receive_output(5)
+        self.assertEqual(async_to_sync(request)()['status'], 200)
@@ -0,0 +1,38 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts import benchmarks
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Число запросов каждой страницы не растёт вместе с данными —
+    новый N+1 в шаблоне или представлении ломает этот тест.
+    """
+
+    def generate(self, prefix, posts):
+        call_command(
+            'generate_data',
+            users=20,
+            groups=2,
+            posts=posts,
+            comments=posts * 3,
+            follows=5,
+            prefix=prefix,
+            stdout=StringIO()
+        )
+
+    def test_query_count_does_not_depend_on_rows(self):
+        self.generate('small', 20)
+        small = benchmarks.run(repeat=1)
+        self.generate('large', 200)
+        large = benchmarks.run(repeat=1)
+        self.assertEqual(set(small), set(large))
+        self.assertEqual(
+            benchmarks.compare(large, small, tolerance=0),
+            []
+        )
+        statuses = {result['status'] for result in large.values()}
+        self.assertLess(max(statuses), 500)
@@ -0,0 +1,108 @@
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from yatube.cache import TwoTierCache, _LocalTier
+
+KEY = 'key'
+VALUE = 'value'
+
+
+class TwoTierCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = os.path.join(directory.name, 'cache.sqlite3')
+        self.first = self.worker()
+        self.second = self.worker()
+
+    def worker(self, max_entries=100):
+        """
+        Экземпляр кэша с собственным L1, как в отдельном процессе.
+        """
+        worker = TwoTierCache('', {
+            'OPTIONS': {
+                'SHARED': {'LOCATION': self.location},
+                'L1_MAX_ENTRIES': max_entries,
+                'POLL_INTERVAL': 0,
+            },
+        })
+        worker._tier = _LocalTier(max_entries)
+        return worker
+
+    def test_basic_operations(self):
+        cache = self.first
+        self.assertIsNone(cache.get(KEY))
+        cache.set(KEY, VALUE)
+        self.assertEqual(cache.get(KEY), VALUE)
+        self.assertFalse(cache.add(KEY, 'other'))
+        self.assertTrue(cache.add('counter', 1))
+        self.assertEqual(cache.incr('counter'), 2)
+        self.assertEqual(
+            cache.get_many([KEY, 'counter', 'missing']),
+            {KEY: VALUE, 'counter': 2}
+        )
+        self.assertTrue(cache.delete(KEY))
+        self.assertIsNone(cache.get(KEY))
+        with self.assertRaises(ValueError):
+            cache.incr('missing')
+
+    def test_second_read_served_from_l1(self):
+        self.first.set(KEY, VALUE)
+        self.second.get(KEY)
+        self.second.get(KEY)
+        self.assertEqual(self.second.hits['l2'], 1)
+        self.assertEqual(self.second.hits['l1'], 1)
+
+    def test_write_invalidates_other_workers(self):
+        self.first.set(KEY, VALUE)
+        self.second.get(KEY)
+        self.first.set(KEY, 'new')
+        self.assertEqual(self.second.get(KEY), 'new')
+        self.first.set('counter', 1)
+        self.assertEqual(self.second.get('counter'), 1)
+        self.first.incr('counter')
+        self.assertEqual(self.second.get('counter'), 2)
+        self.first.delete(KEY)
+        self.assertIsNone(self.second.get(KEY))
+
+    def test_clear_propagates(self):
+        self.first.set(KEY, VALUE)
+        self.second.get(KEY)
+        self.first.clear()
+        self.assertIsNone(self.second.get(KEY))
+
+    def test_l1_evicts_least_recently_used(self):
+        cache = self.worker(max_entries=2)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, key)
+        self.assertEqual(list(cache._tier.entries), [
+            cache.make_key('b'), cache.make_key('c')
+        ])
+        self.assertEqual(cache.get('a'), 'a')
+        self.assertEqual(cache.hits['l2'], 1)
+
+    def test_hits_counted_from_many_threads(self):
+        self.first.set(KEY, VALUE)
+        tier = self.first._tier
+
+        def read(number):
+            # У каждого потока свой экземпляр бэкенда и общий L1.
+            cache = self.worker()
+            cache._tier = tier
+            for _ in range(number):
+                cache.get(KEY)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(read, [500] * 8))
+        self.assertEqual(tier.hits['l1'], 4000)
+
+    def test_tests_use_own_cache_file(self):
+        location = settings.CACHES['default']['OPTIONS']['SHARED']['LOCATION']
+        self.assertNotEqual(
+            location, os.path.join(settings.BASE_DIR, 'cache.sqlite3')
+        )
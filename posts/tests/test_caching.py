@@ -0,0 +1,212 @@
+import re
+
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts.models import Post, User, Group, Follow, Comment
+
+AUTHOR_USERNAME = 'author'
+READER_USERNAME = 'reader'
+SLUG = 'group'
+OTHER_SLUG = 'other'
+POST_TEXT = 'Текст публикации'
+PASSWORD = 'password'
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+INDEX = reverse('index')
+NEW_POST = reverse('new_post')
+FOLLOW_INDEX = reverse('follow_index')
+AUTHOR_PROFILE = reverse('profile', args=[AUTHOR_USERNAME])
+READER_PROFILE = reverse('profile', args=[READER_USERNAME])
+GROUP_POSTS = reverse('group_posts', args=[SLUG])
+OTHER_GROUP_POSTS = reverse('group_posts', args=[OTHER_SLUG])
+PROFILE_FOLLOW = reverse('profile_follow', args=[AUTHOR_USERNAME])
+LOGIN = reverse('login')
+
+
+class FeedCacheTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.AUTHOR = User.objects.create_user(username=AUTHOR_USERNAME)
+        cls.READER = User.objects.create_user(username=READER_USERNAME)
+        cls.GROUP = Group.objects.create(
+            title='testgroup',
+            description='test description',
+            slug=SLUG
+        )
+        cls.OTHER_GROUP = Group.objects.create(
+            title='other group',
+            description='other description',
+            slug=OTHER_SLUG
+        )
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.AUTHOR)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.READER)
+
+    def setUp(self):
+        cache.clear()
+
+    def is_cached(self, client, url):
+        return not client.get(url).templates
+
+    def warm(self, client, urls):
+        for url in urls:
+            client.get(url)
+            self.assertTrue(self.is_cached(client, url))
+
+    def test_new_post_invalidates_affected_pages(self):
+        affected = [INDEX, AUTHOR_PROFILE, GROUP_POSTS]
+        untouched = [OTHER_GROUP_POSTS, READER_PROFILE]
+        self.warm(self.author_client, affected + untouched)
+        self.author_client.post(
+            NEW_POST,
+            data={'text': POST_TEXT, 'group': self.GROUP.id}
+        )
+        for url in affected:
+            with self.subTest(url=url):
+                self.assertFalse(self.is_cached(self.author_client, url))
+        for url in untouched:
+            with self.subTest(url=url):
+                self.assertTrue(self.is_cached(self.author_client, url))
+
+    def test_group_change_invalidates_old_group(self):
+        post = Post.objects.create(
+            author=self.AUTHOR,
+            text=POST_TEXT,
+            group=self.GROUP
+        )
+        self.warm(self.author_client, [GROUP_POSTS, OTHER_GROUP_POSTS])
+        self.author_client.post(
+            reverse('post_edit', args=[AUTHOR_USERNAME, post.id]),
+            data={'text': POST_TEXT, 'group': self.OTHER_GROUP.id}
+        )
+        self.assertFalse(self.is_cached(self.author_client, GROUP_POSTS))
+        self.assertFalse(
+            self.is_cached(self.author_client, OTHER_GROUP_POSTS)
+        )
+
+    def test_comment_invalidates_feeds(self):
+        post = Post.objects.create(author=self.AUTHOR, text=POST_TEXT)
+        self.warm(self.reader_client, [INDEX, AUTHOR_PROFILE])
+        Comment.objects.create(post=post, author=self.READER, text=POST_TEXT)
+        self.assertFalse(self.is_cached(self.reader_client, INDEX))
+        self.assertFalse(self.is_cached(self.reader_client, AUTHOR_PROFILE))
+
+    def test_comment_reuses_loaded_post(self):
+        post = Post.objects.create(
+            author=self.AUTHOR, group=self.GROUP, text=POST_TEXT
+        )
+        loaded = Post.objects.select_related('author', 'group').get(
+            pk=post.pk
+        )
+        # Только INSERT комментария: пост, автор и группа уже загружены.
+        with self.assertNumQueries(1):
+            Comment.objects.create(
+                post=loaded, author=self.READER, text=POST_TEXT
+            )
+        # Без загруженного поста — один запрос с автором и группой.
+        with self.assertNumQueries(2):
+            Comment.objects.create(
+                post_id=post.pk, author=self.READER, text=POST_TEXT
+            )
+
+    def test_follow_invalidates_follow_feed(self):
+        Post.objects.create(author=self.AUTHOR, text=POST_TEXT)
+        self.warm(self.reader_client, [FOLLOW_INDEX, AUTHOR_PROFILE])
+        self.reader_client.get(PROFILE_FOLLOW)
+        response = self.reader_client.get(FOLLOW_INDEX)
+        self.assertEqual(len(response.context['page']), 1)
+        self.assertFalse(self.is_cached(self.reader_client, AUTHOR_PROFILE))
+        Follow.objects.filter(user=self.READER).delete()
+        response = self.reader_client.get(FOLLOW_INDEX)
+        self.assertEqual(len(response.context['page']), 0)
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.AUTHOR = User.objects.create_user(username=AUTHOR_USERNAME)
+        cls.READER = User.objects.create_user(username=READER_USERNAME)
+        cls.GROUP = Group.objects.create(
+            title='testgroup',
+            description='test description',
+            slug=SLUG
+        )
+        cls.POST = Post.objects.create(
+            author=cls.AUTHOR,
+            text=POST_TEXT,
+            group=cls.GROUP
+        )
+        cls.POST_URL = reverse('post', args=[AUTHOR_USERNAME, cls.POST.id])
+        Follow.objects.create(user=cls.READER, author=cls.AUTHOR)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.READER)
+
+    def setUp(self):
+        cache.clear()
+
+    def revalidate(self, url):
+        etag = self.reader_client.get(url)['ETag']
+        return self.reader_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_pages_answer_not_modified(self):
+        for url in (INDEX, GROUP_POSTS, AUTHOR_PROFILE, FOLLOW_INDEX,
+                    self.POST_URL):
+            with self.subTest(url=url):
+                response = self.revalidate(url)
+                self.assertEqual(response.status_code, 304)
+                self.assertFalse(response.templates)
+
+    def test_changes_update_etag(self):
+        for url in INDEX, GROUP_POSTS, AUTHOR_PROFILE, self.POST_URL:
+            etag = self.reader_client.get(url)['ETag']
+            Comment.objects.create(
+                post=self.POST,
+                author=self.READER,
+                text=POST_TEXT
+            )
+            with self.subTest(url=url):
+                response = self.reader_client.get(
+                    url,
+                    HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_user(self):
+        etag = self.reader_client.get(INDEX)['ETag']
+        self.assertEqual(
+            self.client.get(INDEX, HTTP_IF_NONE_MATCH=etag).status_code,
+            200
+        )
+
+    def test_login_refreshes_csrf_token_in_forms(self):
+        self.READER.set_password(PASSWORD)
+        self.READER.save()
+        client = Client(enforce_csrf_checks=True)
+
+        def log_in():
+            client.get(LOGIN)
+            client.post(LOGIN, {
+                'username': READER_USERNAME,
+                'password': PASSWORD,
+                'csrfmiddlewaretoken': client.cookies['csrftoken'].value
+            })
+
+        log_in()
+        etag = client.get(self.POST_URL)['ETag']
+        # Вход заново меняет секрет CSRF: старая форма больше не годится.
+        log_in()
+        response = client.get(self.POST_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        token = CSRF_INPUT.search(response.content.decode()).group(1)
+        response = client.post(
+            reverse('add_comment', args=[AUTHOR_USERNAME, self.POST.id]),
+            {'text': POST_TEXT, 'csrfmiddlewaretoken': token}
+        )
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,68 @@
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post, User, Comment
+
+USERNAME = 'author'
+COMMENTS_PER_PAGE = 20
+
+
+class CommentPaginationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.AUTHOR = User.objects.create_user(username=USERNAME)
+        cls.POST = Post.objects.create(author=cls.AUTHOR, text='Пост')
+        cls.POST_URL = reverse('post', args=[USERNAME, cls.POST.id])
+        cls.COMMENTS_URL = reverse(
+            'post_comments',
+            args=[USERNAME, cls.POST.id]
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def add_comments(self, count):
+        Comment.objects.bulk_create(
+            Comment(post=self.POST, author=self.AUTHOR, text='Комментарий')
+            for number in range(count)
+        )
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_comments(self):
+        self.add_comments(3)
+        few = self.count_queries(self.POST_URL)
+        self.add_comments(50)
+        self.assertEqual(self.count_queries(self.POST_URL), few)
+        response = self.client.get(self.POST_URL)
+        self.assertEqual(len(response.context['comment_page']), COMMENTS_PER_PAGE)
+
+    def test_more_link_walks_all_comments(self):
+        self.add_comments(45)
+        html = self.client.get(self.POST_URL).content.decode()
+        seen = []
+        while True:
+            seen.extend(re.findall(r'name="comment_(\d+)"', html))
+            more = re.search(r'data-fragment="([^"]+)"', html)
+            if more is None:
+                break
+            self.assertTrue(more.group(1).startswith(self.COMMENTS_URL))
+            html = self.client.get(
+                more.group(1).replace('&amp;', '&')
+            ).content.decode()
+        expected = Comment.objects.order_by('-created', '-id')
+        self.assertEqual(
+            [int(pk) for pk in seen],
+            [comment.id for comment in expected]
+        )
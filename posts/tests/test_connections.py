@@ -0,0 +1,79 @@
+import threading
+from unittest import mock
+
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+
+from posts.models import User
+from yatube import db, metrics
+
+CONNECTIONS = metrics.CONNECTION_COUNTER
+
+
+def events():
+    return {
+        key.split('\x1f')[2]: count
+        for key, count in metrics.registry.counters.items()
+        if key.startswith(f'{CONNECTIONS}\x1fdefault\x1f')
+    }
+
+
+# Проверка может закрыть соединение — вне транзакции теста.
+@override_settings(DATABASE_HEALTH_CHECKS=True)
+class ConnectionTests(TransactionTestCase):
+
+    def setUp(self):
+        self.connection = connections['default']
+        self.connection.ensure_connection()
+        metrics.registry.reset()
+
+    def test_reused_connection_is_checked(self):
+        raw = self.connection.connection
+        with mock.patch.object(
+            self.connection, 'is_usable', return_value=True
+        ) as is_usable:
+            db.checkout()
+            User.objects.count()
+            User.objects.count()
+        is_usable.assert_called_once()
+        self.assertIs(self.connection.connection, raw)
+        self.assertEqual(events(), {'reuse': 1})
+
+    def test_failed_check_reopens_connection(self):
+        raw = self.connection.connection
+        with mock.patch.object(
+            self.connection, 'is_usable', return_value=False
+        ):
+            db.checkout()
+        self.assertIsNone(self.connection.connection)
+        User.objects.count()
+        self.assertIsNot(self.connection.connection, raw)
+        self.assertEqual(events(), {'failure': 1, 'open': 1})
+
+    def test_pool_size(self):
+        opened = []
+
+        def other_thread():
+            connection = connections['default']
+            connection.ensure_connection()
+            db.release()
+            opened.append(connection.connection)
+            connection.close()
+
+        with self.settings(DATABASE_POOL_SIZE=1), \
+                mock.patch.dict(db._kept, clear=True):
+            db.release()
+            thread = threading.Thread(target=other_thread)
+            thread.start()
+            thread.join()
+        self.assertEqual(opened, [None])
+        self.assertIsNotNone(self.connection.connection)
+
+    def test_prometheus_output(self):
+        db.checkout()
+        User.objects.count()
+        text = metrics.render_prometheus({}, metrics.registry.counters)
+        self.assertIn(
+            f'{CONNECTIONS}{{alias="default",event="reuse"}} 1',
+            text
+        )
@@ -0,0 +1,81 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts import counters
+from posts.models import Post, User, Follow, UserCounters
+
+AUTHOR_USERNAME = 'author'
+READER_USERNAME = 'reader'
+POST_TEXT = 'Текст публикации'
+
+PROFILE = reverse('profile', args=[AUTHOR_USERNAME])
+PROFILE_FOLLOW = reverse('profile_follow', args=[AUTHOR_USERNAME])
+PROFILE_UNFOLLOW = reverse('profile_unfollow', args=[AUTHOR_USERNAME])
+
+
+class UserCountersTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.AUTHOR = User.objects.create_user(username=AUTHOR_USERNAME)
+        cls.READER = User.objects.create_user(username=READER_USERNAME)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.READER)
+
+    def counters(self, user):
+        counters = UserCounters.objects.get(user=user)
+        return (
+            counters.posts_count,
+            counters.followers_count,
+            counters.following_count
+        )
+
+    def test_counters_follow_writes(self):
+        post = Post.objects.create(author=self.AUTHOR, text=POST_TEXT)
+        self.reader_client.get(PROFILE_FOLLOW)
+        self.assertEqual(self.counters(self.AUTHOR), (1, 1, 0))
+        self.assertEqual(self.counters(self.READER), (0, 0, 1))
+        self.reader_client.get(PROFILE_UNFOLLOW)
+        post.delete()
+        self.assertEqual(self.counters(self.AUTHOR), (0, 0, 0))
+        self.assertEqual(self.counters(self.READER), (0, 0, 0))
+
+    def test_profile_reads_counters(self):
+        Post.objects.create(author=self.AUTHOR, text=POST_TEXT)
+        Follow.objects.create(user=self.READER, author=self.AUTHOR)
+        response = self.reader_client.get(PROFILE)
+        self.assertContains(response, 'Подписчиков: 1')
+        self.assertContains(response, 'Записей: 1')
+
+    def test_reconcile_repairs_drift(self):
+        Post.objects.create(author=self.AUTHOR, text=POST_TEXT)
+        UserCounters.objects.filter(user=self.AUTHOR).update(
+            posts_count=42,
+            followers_count=7
+        )
+        UserCounters.objects.filter(user=self.READER).delete()
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertEqual(self.counters(self.AUTHOR), (1, 0, 0))
+        self.assertEqual(self.counters(self.READER), (0, 0, 0))
+        self.assertIn('2', out.getvalue())
+
+    def test_concurrently_created_row_keeps_increment(self):
+        UserCounters.objects.filter(user=self.AUTHOR).delete()
+        with_actual_counts = counters.with_actual_counts
+
+        def racing(users):
+            # Параллельный запрос создал строку, ещё не видя этот пост.
+            UserCounters.objects.create(user=self.AUTHOR, followers_count=1)
+            return with_actual_counts(users)
+
+        with mock.patch.object(
+            counters, 'with_actual_counts', side_effect=racing
+        ):
+            Post.objects.create(author=self.AUTHOR, text=POST_TEXT)
+        self.assertEqual(self.counters(self.AUTHOR), (1, 1, 0))
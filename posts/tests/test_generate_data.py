@@ -0,0 +1,70 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from posts import counters, search
+from posts.models import Comment, Follow, Post, TimelineEntry, User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class GenerateDataTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def generate(self, prefix, seed=1):
+        call_command(
+            'generate_data',
+            users=30,
+            groups=3,
+            posts=200,
+            comments=300,
+            follows=5,
+            images=2,
+            prefix=prefix,
+            seed=seed,
+            batch_size=64,
+            stdout=StringIO()
+        )
+        return Post.objects.filter(author__username__startswith=prefix)
+
+    def test_rows_and_derived_data(self):
+        posts = self.generate('load')
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(posts.count(), 200)
+        self.assertEqual(Comment.objects.count(), 300)
+        self.assertTrue(posts.exclude(image='').exists())
+        self.assertFalse(
+            posts.exclude(image='').filter(image_width=None).exists()
+        )
+        self.assertFalse(
+            Comment.objects.filter(created__lt=F('post__pub_date')).exists()
+        )
+        expected = sum(
+            follow.author.posts.count() for follow in Follow.objects.all()
+        )
+        self.assertEqual(TimelineEntry.objects.count(), expected)
+        self.assertEqual(counters.reconcile(), 0)
+        word = posts.first().text.split()[0]
+        self.assertTrue(search.search(word).exists())
+
+    def test_same_seed_same_data(self):
+        first = list(self.generate('a').order_by('id').values_list(
+            'text', 'pub_date'
+        ))
+        second = list(self.generate('b').order_by('id').values_list(
+            'text', 'pub_date'
+        ))
+        third = list(self.generate('c', seed=2).order_by('id').values_list(
+            'text', 'pub_date'
+        ))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
@@ -0,0 +1,102 @@
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post, User, Group, Follow, Comment
+
+AUTHOR_USERNAME = 'author'
+READER_USERNAME = 'reader'
+SLUG = 'group'
+POST_TEXT = 'Текст публикации'
+
+INDEX = reverse('index')
+FOLLOW_INDEX = reverse('follow_index')
+PROFILE = reverse('profile', args=[AUTHOR_USERNAME])
+GROUP_POSTS = reverse('group_posts', args=[SLUG])
+
+SQLITE_SCAN = re.compile(r'\bSCAN (TABLE )?\w+$')
+
+
+def plan(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute(f'EXPLAIN {sql}')
+        return [row[0] for row in cursor.fetchall()]
+
+
+def problems(lines):
+    """
+    Строки плана с полным просмотром таблицы или сортировкой.
+    """
+    if connection.vendor == 'sqlite':
+        return [
+            line for line in lines
+            if SQLITE_SCAN.search(line) or 'TEMP B-TREE' in line
+        ]
+    return [
+        line for line in lines
+        if 'Seq Scan' in line or re.search(r'\bSort\b', line)
+    ]
+
+
+class QueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.AUTHOR = User.objects.create_user(username=AUTHOR_USERNAME)
+        cls.READER = User.objects.create_user(username=READER_USERNAME)
+        cls.GROUP = Group.objects.create(
+            title='testgroup',
+            description='test description',
+            slug=SLUG
+        )
+        Follow.objects.create(user=cls.READER, author=cls.AUTHOR)
+        cls.POSTS = [
+            Post.objects.create(
+                author=cls.AUTHOR,
+                text=POST_TEXT,
+                group=cls.GROUP
+            )
+            for _ in range(15)
+        ]
+        Comment.objects.create(
+            post=cls.POSTS[0],
+            author=cls.READER,
+            text=POST_TEXT
+        )
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.READER)
+
+    def assert_indexed(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            first = self.reader_client.get(url)
+            page = first.context['page'] if 'page' in first.context else None
+            if page is not None and page.has_next():
+                self.reader_client.get(f'{url}?after={page.next_cursor}')
+        for query in queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            with self.subTest(url=url, sql=sql):
+                self.assertEqual(problems(plan(sql)), [])
+
+    def test_feeds_use_indexes(self):
+        post = self.POSTS[0]
+        urls = [
+            INDEX,
+            GROUP_POSTS,
+            PROFILE,
+            FOLLOW_INDEX,
+            reverse('post', args=[AUTHOR_USERNAME, post.id]),
+        ]
+        for url in urls:
+            self.assert_indexed(url)
@@ -0,0 +1,140 @@
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from yatube import metrics
+
+METRICS_DIR = tempfile.mkdtemp()
+INDEX = reverse('index')
+METRICS = reverse('metrics')
+TOKEN = 'secret'
+
+
+def record_in_child():
+    metrics.registry.record(
+        'index',
+        {'yatube_request_duration_seconds': 0.02},
+        {'miss': 2}
+    )
+    metrics.registry.flush()
+
+
+@override_settings(
+    METRICS_DIR=METRICS_DIR,
+    METRICS_TOKEN=TOKEN,
+    METRICS_ALLOW_INTERNAL_IPS=False,
+    SERVER_TIMING=True
+)
+class MetricsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='author')
+        Post.objects.create(author=author, text='Текст публикации')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
+        metrics.registry.reset()
+
+    def scrape(self):
+        return self.client.get(
+            METRICS,
+            HTTP_AUTHORIZATION=f'Bearer {TOKEN}'
+        ).content.decode()
+
+    def sample(self, text, line):
+        match = re.search(re.escape(line) + r' (\S+)', text)
+        return match and float(match.group(1))
+
+    def test_server_timing_header(self):
+        header = self.client.get(INDEX)['Server-Timing']
+        self.assertRegex(header, r'db;desc="\d+ SQL";dur=[\d.]+')
+        self.assertRegex(header, r'tpl;dur=[\d.]+')
+        self.assertRegex(header, r'cache;desc="l1=\d+ l2=\d+ miss=\d+"')
+        self.assertRegex(header, r'total;dur=[\d.]+')
+
+    def test_histograms_by_view(self):
+        for _ in range(3):
+            self.client.get(INDEX)
+        text = self.scrape()
+        self.assertEqual(self.sample(
+            text,
+            'yatube_request_duration_seconds_count{view="index"}'
+        ), 3)
+        self.assertGreater(self.sample(
+            text,
+            'yatube_template_duration_seconds_sum{view="index"}'
+        ), 0)
+        self.assertEqual(self.sample(
+            text,
+            'yatube_db_queries_bucket{view="index",le="+Inf"}'
+        ), 3)
+
+    def test_processes_are_summed(self):
+        self.client.get(INDEX)
+        process = multiprocessing.get_context('fork').Process(
+            target=record_in_child
+        )
+        process.start()
+        process.join()
+        self.assertEqual(self.sample(
+            self.scrape(),
+            'yatube_request_duration_seconds_count{view="index"}'
+        ), 2)
+
+    def test_dead_process_files_are_pruned(self):
+        process = multiprocessing.get_context('fork').Process(
+            target=record_in_child
+        )
+        process.start()
+        process.join()
+        path = os.path.join(METRICS_DIR, f'metrics-{process.pid}.json')
+        self.assertEqual(self.sample(
+            self.scrape(),
+            'yatube_request_duration_seconds_count{view="index"}'
+        ), 1)
+        with self.settings(METRICS_RETENTION=-1):
+            self.scrape()
+        self.assertFalse(os.path.exists(path))
+
+    def test_access(self):
+        self.assertEqual(self.client.get(METRICS).status_code, 403)
+        self.assertEqual(
+            self.client.get(
+                METRICS,
+                HTTP_AUTHORIZATION='Bearer wrong'
+            ).status_code,
+            403
+        )
+        with self.settings(METRICS_TOKEN=''):
+            self.assertEqual(
+                self.client.get(
+                    METRICS,
+                    HTTP_AUTHORIZATION='Bearer '
+                ).status_code,
+                403
+            )
+        with self.settings(METRICS_ALLOW_INTERNAL_IPS=True):
+            self.assertEqual(self.client.get(METRICS).status_code, 200)
+            self.assertEqual(
+                self.client.get(METRICS, REMOTE_ADDR='10.0.0.1').status_code,
+                403
+            )
+
+    def test_server_timing_is_off_by_default(self):
+        with self.settings(SERVER_TIMING=False):
+            self.assertFalse(self.client.get(INDEX).has_header(
+                'Server-Timing'
+            ))
@@ -0,0 +1,109 @@
+import timeit
+
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Post, User
+from posts.paginators import CursorPaginator
+
+USERNAME = 'dimabuslaev'
+POSTS_COUNT = 25
+PER_PAGE = 10
+PAGINATOR_TEMPLATE = 'paginator.html'
+
+
+class CursorPaginatorTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USER = User.objects.create_user(username=USERNAME)
+        cls.POSTS = [
+            Post.objects.create(author=cls.USER, text=f'Пост {number}')
+            for number in range(POSTS_COUNT)
+        ]
+        # Одинаковая дата у части постов проверяет сравнение по id.
+        Post.objects.filter(
+            id__in=[post.id for post in cls.POSTS[:5]]
+        ).update(pub_date=cls.POSTS[0].pub_date)
+        cls.EXPECTED = list(Post.objects.order_by('-pub_date', '-id'))
+
+    def setUp(self):
+        self.paginator = CursorPaginator(Post.objects.all(), PER_PAGE)
+
+    def test_forward_walk(self):
+        seen = []
+        page = self.paginator.get_page()
+        self.assertFalse(page.has_previous())
+        while True:
+            seen.extend(page)
+            if not page.has_next():
+                break
+            page = self.paginator.get_page(after=page.next_cursor)
+        self.assertEqual(seen, self.EXPECTED)
+
+    def test_backward_walk(self):
+        first = self.paginator.get_page()
+        second = self.paginator.get_page(after=first.next_cursor)
+        back = self.paginator.get_page(before=second.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_invalid_cursor(self):
+        for cursor in ('garbage', 'Zm9v', '!!!'):
+            with self.subTest(cursor=cursor):
+                page = self.paginator.get_page(after=cursor)
+                self.assertEqual(list(page), self.EXPECTED[:PER_PAGE])
+
+    def test_single_query_without_count(self):
+        page = self.paginator.get_page()
+        with CaptureQueriesContext(connection) as queries:
+            page = self.paginator.get_page(after=page.next_cursor)
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]['sql'].upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+
+
+class CursorNavigationBenchmark(TestCase):
+    """
+    Бенчмарк: навигация — две ссылки с курсорами, поэтому её размер и
+    время выборки и отрисовки страницы не растут вместе с лентой.
+    """
+
+    def add_posts(self, author, total):
+        Post.objects.bulk_create(
+            Post(author=author, text=f'Пост {number}')
+            for number in range(Post.objects.count(), total)
+        )
+
+    def measure(self):
+        paginator = CursorPaginator(Post.objects.all(), PER_PAGE)
+        middle = Post.objects.order_by('-pub_date', '-id')[
+            Post.objects.count() // 2
+        ]
+        cursor = paginator.encode_cursor(middle)
+
+        def render():
+            return render_to_string(PAGINATOR_TEMPLATE, {
+                'items': paginator.get_page(after=cursor),
+                'paginator': paginator
+            })
+
+        html = render()
+        seconds = min(timeit.repeat(render, number=20, repeat=5))
+        return len(html), seconds
+
+    def test_render_cost_does_not_depend_on_posts(self):
+        author = User.objects.create_user(username=USERNAME)
+        self.add_posts(author, 10 ** 2)
+        small_size, small_time = self.measure()
+        self.add_posts(author, 10 ** 4)
+        large_size, large_time = self.measure()
+        # Меняются только цифры id в курсорах.
+        self.assertLess(abs(large_size - small_size), 10)
+        self.assertLess(large_time, small_time * 3)
@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts.caching import card_key
+from posts.models import Post, User, Comment
+
+AUTHOR_USERNAME = 'author'
+READER_USERNAME = 'reader'
+POST_TEXT = 'Текст публикации'
+POST_TEXT_CHANGED = 'Изменённый текст публикации'
+
+INDEX = reverse('index')
+PROFILE = reverse('profile', args=[AUTHOR_USERNAME])
+CARD_TEMPLATE = 'post_frame.html'
+
+
+class PostCardCacheTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.AUTHOR = User.objects.create_user(username=AUTHOR_USERNAME)
+        cls.READER = User.objects.create_user(username=READER_USERNAME)
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.AUTHOR)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.READER)
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(author=self.AUTHOR, text=POST_TEXT)
+        self.POST_EDIT = reverse(
+            'post_edit',
+            args=[AUTHOR_USERNAME, self.post.id]
+        )
+
+    def key(self):
+        return card_key(Post.objects.for_feed().get(pk=self.post.pk))
+
+    def rendered_cards(self, client, url):
+        templates = [template.name for template in client.get(url).templates]
+        return templates.count(CARD_TEMPLATE)
+
+    def test_card_is_rendered_once_for_all_users(self):
+        self.assertEqual(self.rendered_cards(self.reader_client, INDEX), 1)
+        self.assertEqual(self.rendered_cards(self.author_client, PROFILE), 0)
+
+    def test_edit_link_only_for_author(self):
+        self.assertContains(self.author_client.get(INDEX), self.POST_EDIT)
+        self.assertNotContains(self.reader_client.get(INDEX), self.POST_EDIT)
+
+    def test_changes_produce_new_key(self):
+        key = self.key()
+        Comment.objects.create(
+            post=self.post,
+            author=self.READER,
+            text=POST_TEXT
+        )
+        after_comment = self.key()
+        self.assertNotEqual(after_comment, key)
+        self.author_client.post(self.POST_EDIT, {'text': POST_TEXT_CHANGED})
+        self.assertNotEqual(self.key(), after_comment)
+        self.assertContains(self.reader_client.get(INDEX), POST_TEXT_CHANGED)
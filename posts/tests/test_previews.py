@@ -0,0 +1,78 @@
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase
+from PIL import Image
+
+from posts import previews, thumbnails
+from posts.management.commands import backfill_image_metadata
+from posts.models import Post, User
+
+USERNAME = 'author'
+POST_TEXT = 'Текст публикации'
+SIZE = (120, 80)
+
+
+def png():
+    buffer = BytesIO()
+    Image.new('RGB', SIZE, color=(10, 200, 10)).save(buffer, 'PNG')
+    return SimpleUploadedFile('preview.png', buffer.getvalue(), 'image/png')
+
+
+class ImagePreviewTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USER = User.objects.create_user(username=USERNAME)
+
+    def test_image_save_fills_metadata(self):
+        post = Post.objects.create(author=self.USER, text=POST_TEXT,
+                                   image=png())
+        post.refresh_from_db()
+        self.assertEqual((post.image_width, post.image_height), SIZE)
+        self.assertTrue(post.image_placeholder.startswith('data:image/'))
+        with mock.patch.object(previews, 'describe') as describe:
+            post.text = POST_TEXT * 2
+            post.save()
+        describe.assert_not_called()
+
+    def test_post_without_image(self):
+        post = Post.objects.create(author=self.USER, text=POST_TEXT)
+        self.assertIsNone(post.image_width)
+        self.assertEqual(post.image_placeholder, '')
+
+    def test_backfill_command(self):
+        posts = [
+            Post.objects.create(author=self.USER, text=POST_TEXT,
+                                image=png())
+            for _ in range(3)
+        ]
+        Post.objects.update(
+            image_width=None,
+            image_height=None,
+            image_placeholder=''
+        )
+        out = StringIO()
+        # Порции по два поста: последняя порция неполная.
+        with mock.patch.object(backfill_image_metadata, 'BATCH_SIZE', 2):
+            call_command('backfill_image_metadata', processes=2, stdout=out)
+        for post in posts:
+            post.refresh_from_db()
+            self.assertEqual((post.image_width, post.image_height), SIZE)
+            self.assertTrue(post.image_placeholder)
+        self.assertIn('Обновлено постов: 3', out.getvalue())
+
+    def test_picture_uses_stored_size(self):
+        post = Post.objects.create(author=self.USER, text=POST_TEXT,
+                                   image=png())
+        with mock.patch.object(thumbnails, 'ensure'):
+            html = Template(
+                '{% load post_images %}{% post_picture post %}'
+            ).render(Context({'post': post}))
+        width, height = SIZE
+        self.assertIn(f'width="{width}" height="{height}"', html)
+        self.assertIn(f'aspect-ratio: {width} / {height}', html)
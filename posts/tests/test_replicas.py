@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from yatube.replicas import PIN_COOKIE
+
+USERNAME = 'author'
+POST_TEXT = 'Новый пост'
+
+INDEX = reverse('index')
+NEW_POST = reverse('new_post')
+REPLICA_DIR = tempfile.mkdtemp()
+REPLICA = os.path.join(REPLICA_DIR, 'replica.sqlite3')
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaTests(TransactionTestCase):
+    """
+    Реплика — копия пустой тестовой базы, которая не получает новых
+    строк, то есть бесконечно отстающая реплика.
+    """
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls):
+        primary = connections['default'].settings_dict
+        shutil.copy(primary['NAME'], REPLICA)
+        connections.databases['replica'] = {**primary, 'NAME': REPLICA}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections['replica']
+        del connections.databases['replica']
+        shutil.rmtree(REPLICA_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username=USERNAME)
+        self.client.force_login(self.author)
+
+    def new_post(self):
+        response = self.client.post(NEW_POST, {'text': POST_TEXT})
+        post = Post.objects.get(text=POST_TEXT)
+        return response, reverse('post', args=[USERNAME, post.id])
+
+    def test_writer_reads_own_post_from_primary(self):
+        response, url = self.new_post()
+        self.assertRedirects(response, INDEX, fetch_redirect_response=False)
+        cookie = response.cookies[PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_PIN_SECONDS)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        # Окно закончилось: и сессия, и пост читаются с реплики.
+        del self.client.cookies[PIN_COOKIE]
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_other_clients_read_replica(self):
+        _, url = self.new_post()
+        self.assertEqual(Client().get(url).status_code, 404)
+
+    def test_feed_cache_not_stale_after_replica_lag(self):
+        reader = Client()
+        reader.get(INDEX)
+        self.new_post()
+        # Реплика ещё без поста: такая страница не кэшируется и не
+        # получает ETag под новой версией ленты.
+        response = reader.get(INDEX)
+        self.assertNotContains(response, POST_TEXT)
+        self.assertFalse(response.has_header('ETag'))
+        # Реплика догнала основную базу.
+        connections['replica'].close()
+        shutil.copy(connections['default'].settings_dict['NAME'], REPLICA)
+        self.assertContains(reader.get(INDEX), POST_TEXT)
+
+    def test_no_migrations_on_replica(self):
+        self.assertFalse(router.allow_migrate('replica', 'posts'))
+        self.assertTrue(router.allow_migrate('default', 'posts'))
@@ -0,0 +1,118 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Post, User, Group
+
+AUTHOR_USERNAME = 'author'
+OTHER_USERNAME = 'other'
+SLUG = 'group'
+
+SEARCH = reverse('search')
+SEARCH_API = reverse('search_api')
+
+
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.AUTHOR = User.objects.create_user(username=AUTHOR_USERNAME)
+        cls.OTHER = User.objects.create_user(username=OTHER_USERNAME)
+        cls.GROUP = Group.objects.create(
+            title='testgroup',
+            description='test description',
+            slug=SLUG
+        )
+
+    def found(self, **params):
+        response = self.client.get(SEARCH_API, params)
+        return [result['id'] for result in response.json()['results']]
+
+    def test_ranked_prefix_search(self):
+        once = Post.objects.create(
+            author=self.AUTHOR,
+            text='Прогулка по набережной и длинный рассказ о погоде'
+        )
+        twice = Post.objects.create(
+            author=self.AUTHOR,
+            text='Набережная, набережная'
+        )
+        Post.objects.create(author=self.AUTHOR, text='Совсем о другом')
+        self.assertEqual(self.found(q='набережн'), [twice.id, once.id])
+
+    def test_filters(self):
+        in_group = Post.objects.create(
+            author=self.AUTHOR,
+            text='Котики',
+            group=self.GROUP
+        )
+        by_other = Post.objects.create(author=self.OTHER, text='Котики')
+        self.assertEqual(self.found(q='котики', group=SLUG), [in_group.id])
+        self.assertEqual(
+            self.found(q='котики', author=OTHER_USERNAME),
+            [by_other.id]
+        )
+
+    def test_index_follows_edits_and_deletes(self):
+        post = Post.objects.create(author=self.AUTHOR, text='Старый текст')
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(self.found(q='старый'), [])
+        self.assertEqual(self.found(q='новый'), [post.id])
+        post.delete()
+        self.assertEqual(self.found(q='новый'), [])
+
+    def test_cursor_pagination(self):
+        posts = [
+            Post.objects.create(author=self.AUTHOR, text=f'Заметка {number}')
+            for number in range(15)
+        ]
+        seen = []
+        params = {'q': 'заметка'}
+        while True:
+            data = self.client.get(SEARCH_API, params).json()
+            seen.extend(result['id'] for result in data['results'])
+            if data['next'] is None:
+                break
+            params['after'] = data['next']
+        self.assertEqual(sorted(seen), sorted(post.id for post in posts))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    @skipUnless(connection.vendor == 'postgresql', 'ранги ts_rank')
+    def test_cursor_pagination_with_tied_ranks(self):
+        # Одинаковые тексты дают равные ранги real на границах страниц.
+        posts = [
+            Post.objects.create(author=self.AUTHOR, text='Заметка о погоде')
+            for _ in range(25)
+        ] + [
+            Post.objects.create(
+                author=self.AUTHOR,
+                text='Заметка о погоде, погоде и снова погоде'
+            )
+            for _ in range(5)
+        ]
+        seen = []
+        params = {'q': 'погода'}
+        while True:
+            data = self.client.get(SEARCH_API, params).json()
+            seen.extend(result['id'] for result in data['results'])
+            if data['next'] is None:
+                break
+            params['after'] = data['next']
+        self.assertEqual(
+            seen,
+            [post.id for post in posts[:-6:-1]]
+            + [post.id for post in posts[-6::-1]]
+        )
+
+    def test_search_page(self):
+        Post.objects.create(author=self.AUTHOR, text='Поиск на странице')
+        response = self.client.get(SEARCH, {'q': 'странице'})
+        self.assertEqual(len(response.context['page']), 1)
+        self.assertEqual(
+            self.client.get(SEARCH_API, {'q': ''}).status_code,
+            400
+        )
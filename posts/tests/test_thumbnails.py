@@ -0,0 +1,149 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.urls import reverse
+from sorl.thumbnail import get_thumbnail
+from sorl.thumbnail.base import ThumbnailBackend
+
+from posts import thumbnails
+from posts.models import Post, User
+from yatube.urls import MEDIA_MAX_AGE, serve_media
+
+USERNAME = 'author'
+POST_TEXT = 'Текст публикации'
+INDEX = reverse('index')
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+
+
+class ThumbnailTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USER = User.objects.create_user(username=USERNAME)
+
+    def create_post(self):
+        return Post.objects.create(
+            author=self.USER,
+            text=POST_TEXT,
+            image=SimpleUploadedFile(
+                name='thumbnail.gif',
+                content=SMALL_GIF,
+                content_type='image/gif'
+            )
+        )
+
+    def run_on_commit(self):
+        # TestCase не фиксирует транзакцию, вызываем хуки сами.
+        while connection.run_on_commit:
+            _, callback = connection.run_on_commit.pop(0)
+            callback()
+
+    def test_image_save_schedules_generation(self):
+        with mock.patch.object(thumbnails, '_submit') as submit:
+            post = self.create_post()
+            self.run_on_commit()
+            submit.assert_called_once_with(post.image)
+            submit.reset_mock()
+            post.text = POST_TEXT * 2
+            post.save()
+            self.run_on_commit()
+            submit.assert_not_called()
+
+    def test_template_lookup_after_generation_is_cheap(self):
+        post = self.create_post()
+        thumbnails.generate(post.image)
+        with mock.patch.object(
+            ThumbnailBackend,
+            '_create_thumbnail'
+        ) as create:
+            for geometry, options in thumbnails.GEOMETRIES:
+                get_thumbnail(post.image, geometry, **options)
+        create.assert_not_called()
+
+    def render_picture(self, post):
+        return Template(
+            '{% load post_images %}{% post_picture post %}'
+        ).render(Context({'post': post}))
+
+    def test_picture_has_modern_formats_ladder(self):
+        post = self.create_post()
+        thumbnails.generate(post.image)
+        html = self.render_picture(post)
+        for image_format, variants in thumbnails.VARIANTS.items():
+            with self.subTest(image_format=image_format):
+                self.assertIn(f'type="image/{image_format.lower()}"', html)
+                for width, _, _ in variants:
+                    self.assertIn(f' {width}w', html)
+        self.assertIn('<img', html)
+
+    def test_cached_finds_generated_thumbnails(self):
+        post = self.create_post()
+        for geometry, options in thumbnails.GEOMETRIES:
+            self.assertIsNone(thumbnails.cached(post.image, geometry, options))
+        thumbnails.generate(post.image)
+        for geometry, options in thumbnails.GEOMETRIES:
+            with self.subTest(geometry=geometry, options=options):
+                self.assertEqual(
+                    thumbnails.cached(post.image, geometry, options).name,
+                    get_thumbnail(post.image, geometry, **options).name
+                )
+
+    def test_picture_never_resizes_during_request(self):
+        post = self.create_post()
+        with mock.patch.object(
+            ThumbnailBackend,
+            '_create_thumbnail'
+        ) as create, mock.patch.object(thumbnails, 'ensure') as ensure:
+            html = self.render_picture(post)
+        create.assert_not_called()
+        ensure.assert_called_once_with(post.image)
+        self.assertIn(f'src="{post.image.url}"', html)
+        self.assertNotIn('<source', html)
+
+    def test_media_is_cached_for_a_long_time(self):
+        post = self.create_post()
+        response = serve_media(
+            RequestFactory().get(post.image.url),
+            post.image.name,
+            document_root=settings.MEDIA_ROOT
+        )
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn(f'max-age={MEDIA_MAX_AGE}', response['Cache-Control'])
+
+
+class BackgroundThumbnailTests(TransactionTestCase):
+    """
+    Воркер нарезки работает в своём потоке и видит только
+    зафиксированные данные.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username=USERNAME)
+
+    def test_feed_shows_thumbnails_once_generated(self):
+        with mock.patch.object(thumbnails, '_submit'):
+            post = Post.objects.create(
+                author=self.user,
+                text=POST_TEXT,
+                image=SimpleUploadedFile(
+                    name='pending.gif',
+                    content=SMALL_GIF,
+                    content_type='image/gif'
+                )
+            )
+            response = self.client.get(INDEX)
+        self.assertContains(response, f'src="{post.image.url}"')
+        self.assertNotContains(response, 'srcset=')
+        thumbnails._submit(post.image).result()
+        self.assertContains(self.client.get(INDEX), 'srcset=')
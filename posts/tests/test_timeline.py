@@ -0,0 +1,58 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts.models import Post, User, Follow, TimelineEntry
+
+AUTHOR_USERNAME = 'author'
+READER_USERNAME = 'reader'
+POST_TEXT = 'Текст публикации'
+
+FOLLOW_INDEX = reverse('follow_index')
+PROFILE_FOLLOW = reverse('profile_follow', args=[AUTHOR_USERNAME])
+PROFILE_UNFOLLOW = reverse('profile_unfollow', args=[AUTHOR_USERNAME])
+
+
+class TimelineTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.AUTHOR = User.objects.create_user(username=AUTHOR_USERNAME)
+        cls.READER = User.objects.create_user(username=READER_USERNAME)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.READER)
+
+    def timeline_posts(self):
+        return list(
+            TimelineEntry.objects.filter(user=self.READER)
+            .values_list('post_id', flat=True)
+        )
+
+    def test_follow_backfills_existing_posts(self):
+        post = Post.objects.create(author=self.AUTHOR, text=POST_TEXT)
+        self.reader_client.get(PROFILE_FOLLOW)
+        self.assertEqual(self.timeline_posts(), [post.id])
+
+    def test_new_post_fans_out_to_followers(self):
+        Follow.objects.create(user=self.READER, author=self.AUTHOR)
+        post = Post.objects.create(author=self.AUTHOR, text=POST_TEXT)
+        self.assertEqual(self.timeline_posts(), [post.id])
+
+    def test_unfollow_prunes_timeline(self):
+        Follow.objects.create(user=self.READER, author=self.AUTHOR)
+        Post.objects.create(author=self.AUTHOR, text=POST_TEXT)
+        self.reader_client.get(PROFILE_UNFOLLOW)
+        self.assertEqual(self.timeline_posts(), [])
+
+    def test_follow_index_reads_timeline(self):
+        Follow.objects.create(user=self.READER, author=self.AUTHOR)
+        posts = [
+            Post.objects.create(author=self.AUTHOR, text=POST_TEXT)
+            for _ in range(3)
+        ]
+        response = self.reader_client.get(FOLLOW_INDEX)
+        self.assertEqual(
+            list(response.context['page']),
+            sorted(posts, key=lambda post: (post.pub_date, post.id),
+                   reverse=True)
+        )
@@ -0,0 +1,92 @@
+from itertools import cycle
+
+from django.test import SimpleTestCase
+
+from yatube.tracing import Sampler, TokenBucket
+
+SKIP = ('/static/', '/health')
+
+
+def context(path):
+    return {'wsgi_environ': {'PATH_INFO': path}}
+
+
+def event(path, seconds=0.1, status='ok'):
+    return {
+        'start_timestamp': 100.0,
+        'timestamp': 100.0 + seconds,
+        'contexts': {'trace': {'status': status}},
+        'request': {'url': f'http://testserver{path}'},
+    }
+
+
+class SamplerTests(SimpleTestCase):
+
+    def sampler(self, values=(0.0,), **kwargs):
+        options = dict(
+            rate=0.1, record_rate=0.5, slow_ms=500,
+            per_second=100, skip=SKIP
+        )
+        options.update(kwargs)
+        return Sampler(rand=cycle(values).__next__, **options)
+
+    def test_skipped_routes_are_never_traced(self):
+        sampler = self.sampler()
+        for path in ('/static/style.css', '/health/'):
+            with self.subTest(path=path):
+                self.assertEqual(sampler.traces_sampler(context(path)), 0)
+        self.assertEqual(sampler.traces_sampler(context('/')), 1.0)
+
+    def test_record_rate_decides_recording(self):
+        sampler = self.sampler(values=(0.4, 0.6))
+        self.assertEqual(sampler.traces_sampler(context('/')), 1.0)
+        self.assertEqual(sampler.traces_sampler(context('/')), 0)
+
+    def test_route_rates_override_base_rate(self):
+        sampler = self.sampler(
+            values=(0.7,), rates={'index': '0.8'}, record_rate=0.0
+        )
+        self.assertEqual(sampler.route_rate('/'), 0.8)
+        self.assertEqual(sampler.route_rate('/new/'), 0.1)
+        self.assertEqual(sampler.traces_sampler(context('/')), 1.0)
+        self.assertEqual(sampler.traces_sampler(context('/new/')), 0)
+
+    def test_per_second_cap(self):
+        sampler = self.sampler(per_second=3)
+        traced = [
+            sampler.traces_sampler(context('/')) for _ in range(10)
+        ]
+        self.assertEqual(traced.count(1.0), 3)
+
+    def test_slow_and_failed_transactions_are_kept(self):
+        sampler = self.sampler(values=(0.99,))
+        slow = event('/', seconds=0.5)
+        failed = event('/', status='internal_error')
+        self.assertIs(sampler.before_send_transaction(slow, {}), slow)
+        self.assertIs(sampler.before_send_transaction(failed, {}), failed)
+        self.assertIsNone(sampler.before_send_transaction(event('/'), {}))
+
+    def test_fast_transactions_kept_at_base_rate(self):
+        # Записана половина запросов, оставить нужно 0.1 / 0.5 из них.
+        sampler = self.sampler(values=(0.1, 0.3))
+        self.assertIsNotNone(sampler.before_send_transaction(event('/'), {}))
+        self.assertIsNone(sampler.before_send_transaction(event('/'), {}))
+
+    def test_override_traces_without_sending(self):
+        sampler = self.sampler(values=(0.99,))
+        sampler.override = 1.0
+        self.assertEqual(sampler.traces_sampler(context('/')), 1.0)
+        self.assertEqual(sampler.traces_sampler(context('/static/a')), 0)
+        slow = event('/', seconds=2)
+        self.assertIsNone(sampler.before_send_transaction(slow, {}))
+
+
+class TokenBucketTests(SimpleTestCase):
+
+    def test_refills_over_time(self):
+        bucket = TokenBucket(rate=2)
+        self.assertTrue(bucket.take())
+        self.assertTrue(bucket.take())
+        self.assertFalse(bucket.take())
+        bucket.updated -= 1
+        self.assertTrue(bucket.take())
@@ -0,0 +1,62 @@
+import hashlib
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.models import Post, User
+
+USERNAME = 'author'
+POST_TEXT = 'Текст публикации'
+NEW_POST = reverse('new_post')
+MAX_SIZE = 100
+
+
+def jpeg(size, exif=True):
+    image = Image.new('RGB', size, color=(200, 10, 10))
+    buffer = BytesIO()
+    options = {}
+    if exif:
+        data = Image.Exif()
+        data[0x010F] = 'Camera'
+        options['exif'] = data.tobytes()
+    image.save(buffer, 'JPEG', **options)
+    return buffer.getvalue()
+
+
+class UploadTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USER = User.objects.create_user(username=USERNAME)
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.USER)
+
+    def upload(self, content, name='photo.jpg'):
+        self.author_client.post(NEW_POST, {
+            'text': POST_TEXT,
+            'image': SimpleUploadedFile(name, content, 'image/jpeg'),
+        })
+        return Post.objects.latest('id').image
+
+    def test_name_is_content_hash(self):
+        content = jpeg((20, 20), exif=False)
+        image = self.upload(content)
+        digest = hashlib.sha256(content).hexdigest()
+        self.assertEqual(image.name, f'posts/{digest}.jpg')
+        self.assertEqual(image.read(), content)
+
+    def test_identical_uploads_share_file(self):
+        content = jpeg((20, 20))
+        first = self.upload(content, 'first.jpg')
+        second = self.upload(content, 'second.jpg')
+        self.assertEqual(first.name, second.name)
+
+    @override_settings(POST_IMAGE_MAX_SIZE=MAX_SIZE)
+    def test_large_image_is_downscaled_without_metadata(self):
+        image = Image.open(self.upload(jpeg((MAX_SIZE * 4, MAX_SIZE * 2))))
+        self.assertEqual(image.size, (MAX_SIZE, MAX_SIZE // 2))
+        self.assertNotIn('exif', image.info)
@@ -60,6 +60,7 @@ class StaticURLTests(TestCase):
         )
 
     def test_pages(self):
+        cache.clear()
         urls = {
             INDEX: INDEX_TEMPLATE,
             GROUP_POSTS: GROUP_POSTS_TEMPLATE,
@@ -94,8 +95,7 @@ class StaticURLTests(TestCase):
 
     def test_cache(self):
         first_response = self.authorized_client.get(INDEX)
-        self.TARGET_POST.text = 'новый текст'
-        self.TARGET_POST.save()
+        Post.objects.filter(pk=self.TARGET_POST.pk).update(text='новый текст')
         second_response = self.authorized_client.get(INDEX)
         self.assertEqual(first_response.content, second_response.content)
         cache.clear()
@@ -1,9 +1,11 @@
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from posts.models import Post, User, Group, Follow
+from posts.models import Post, User, Group, Follow, Comment
 
 # Constants
 POST_TEXT = 'Текст публикации'
@@ -135,7 +137,7 @@ class StaticURLTests(TestCase):
                 if 'post' in response.context:
                     post_test = response.context['post']
                 else:
-                    posts_count = response.context['page'].object_list.count()
+                    posts_count = len(response.context['page'].object_list)
                     self.assertEqual(posts_count, 1)
                     post_test = response.context['page'][0]
                 self.assertEqual(post_test, self.TARGET_POST)
@@ -213,3 +215,35 @@ class StaticURLTests(TestCase):
         image_file = post.image
         image_binary = image_file.read()
         self.assertEqual(image_binary, self.SMALL_GIF)
+
+    def test_feed_query_count_does_not_depend_on_posts(self):
+        Follow.objects.create(author=self.FIRST_USER, user=self.SECOND_USER)
+        follower_client = Client()
+        follower_client.force_login(self.SECOND_USER)
+        urls = {
+            INDEX: self.unauthorized_client,
+            PROFILE: self.unauthorized_client,
+            GROUP_POSTS: self.unauthorized_client,
+            self.POST: self.unauthorized_client,
+            FOLLOW_INDEX: follower_client,
+        }
+        for url, client in urls.items():
+            with self.subTest(url=url):
+                cache.clear()
+                with CaptureQueriesContext(connection) as single:
+                    client.get(url)
+                for _ in range(9):
+                    post = Post.objects.create(
+                        author=self.FIRST_USER,
+                        text=POST_TEXT,
+                        group=self.GROUP,
+                    )
+                    Comment.objects.create(
+                        post=post,
+                        author=self.SECOND_USER,
+                        text=POST_TEXT
+                    )
+                cache.clear()
+                with CaptureQueriesContext(connection) as full:
+                    client.get(url)
+                self.assertEqual(len(full), len(single))
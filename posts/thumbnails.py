@@ -0,0 +1,153 @@
+"""
+Заблаговременная нарезка миниатюр картинок постов.
+
+Миниатюры создаются в фоновом потоке после фиксации транзакции.
+Тег {% post_picture %} только ищет готовые миниатюры в хранилище
+ключей sorl (cached()) и никогда не декодирует картинку во время
+запроса: пока миниатюр нет, показывается исходная картинка, а карточка
+с ней не кэшируется. Когда нарезка готова, версии лент поста
+сбрасываются, и страницы отрисовываются уже с миниатюрами.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from PIL import Image, features
+from sorl.thumbnail import base, default, get_thumbnail
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+logger = logging.getLogger(__name__)
+
+# Карточка поста шириной 960 пикселей. Картинка не обрезается: её
+# пропорции задают размеры <img> (поля image_width и image_height).
+WIDTH = 960
+OPTIONS = {'upscale': True}
+# Ширины для srcset в современных форматах.
+WIDTHS = (320, 640, 960)
+
+
+def _modern_formats():
+    formats = []
+    if features.check('webp'):
+        formats.append('WEBP')
+    Image.init()
+    if 'AVIF' in Image.SAVE:
+        # sorl знает только JPEG, PNG, GIF и WebP.
+        base.EXTENSIONS.setdefault('AVIF', 'avif')
+        formats.insert(0, 'AVIF')
+    return formats
+
+
+MODERN_FORMATS = _modern_formats()
+
+
+def geometry(width):
+    # В sorl одна ширина означает «высота — по пропорциям».
+    return str(width)
+
+
+# JPEG шириной 960 — запасной вариант для старых браузеров.
+FALLBACK = (geometry(WIDTH), OPTIONS)
+VARIANTS = {
+    image_format: [
+        (width, geometry(width), {**OPTIONS, 'format': image_format})
+        for width in WIDTHS
+    ]
+    for image_format in MODERN_FORMATS
+}
+GEOMETRIES = [FALLBACK] + [
+    (variant_geometry, options)
+    for variants in VARIANTS.values()
+    for _, variant_geometry, options in variants
+]
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.THUMBNAIL_WORKERS,
+    thread_name_prefix='thumbnails'
+)
+_in_progress = set()
+_in_progress_lock = threading.Lock()
+
+
+def generate(image):
+    """
+    Создаёт все миниатюры картинки. Возвращает их число.
+    """
+    for geometry, options in GEOMETRIES:
+        get_thumbnail(image, geometry, **options)
+    return len(GEOMETRIES)
+
+
+def cached(image, geometry, options):
+    """
+    Готовая миниатюра из хранилища ключей sorl или None. Имя миниатюры
+    вычисляется так же, как в get_thumbnail(), но при промахе картинка
+    не открывается и не нарезается.
+    """
+    backend = default.backend
+    source = ImageFile(image)
+    options = dict(options)
+    if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(sorl_defaults, attr):
+            options.setdefault(key, value)
+    name = backend._get_thumbnail_filename(source, geometry, options)
+    return default.kvstore.get(ImageFile(name, default.storage))
+
+
+def _refresh(image):
+    # Импорт здесь: caching и модели загружаются после этого модуля.
+    from .caching import post_changed
+    from .models import Post
+    posts = Post.objects.filter(image=image.name).select_related(
+        'author', 'group'
+    )
+    for post in posts:
+        post_changed(post)
+
+
+def _generate_in_background(image):
+    try:
+        generate(image)
+        _refresh(image)
+    except Exception:
+        logger.exception('Не удалось создать миниатюры %s', image.name)
+    finally:
+        with _in_progress_lock:
+            _in_progress.discard(image.name)
+        # У потока своё соединение с базой, его нужно закрыть самим.
+        connection.close()
+
+
+def _submit(image):
+    with _in_progress_lock:
+        # Повторные сохранения поста не запускают нарезку дважды.
+        if image.name in _in_progress:
+            return None
+        _in_progress.add(image.name)
+    return _executor.submit(_generate_in_background, image)
+
+
+def ensure(image):
+    """
+    Ставит нарезку в очередь сразу, например если миниатюры пропали
+    из хранилища ключей. Повторные вызовы не дублируют работу.
+    """
+    return _submit(image)
+
+
+def schedule(post):
+    """
+    Ставит нарезку миниатюр поста в очередь после фиксации транзакции.
+    """
+    if post.image:
+        image = post.image
+        transaction.on_commit(lambda: _submit(image))
@@ -0,0 +1,71 @@
+from itertools import islice
+
+from django.db import connection
+
+from .models import Follow, TimelineEntry
+
+BATCH_SIZE = 1000
+
+
+def _insert(entries):
+    entries = iter(entries)
+    while True:
+        batch = list(islice(entries, BATCH_SIZE))
+        if not batch:
+            break
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def fan_out(post):
+    """
+    Добавляет новый пост в ленты всех подписчиков его автора.
+    """
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    _insert(
+        TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in followers.iterator()
+    )
+
+
+def backfill(user, author):
+    """
+    Переносит в ленту пользователя уже опубликованные посты автора.
+    """
+    posts = author.posts.values_list('id', 'pub_date')
+    _insert(
+        TimelineEntry(user=user, post_id=post_id, pub_date=pub_date)
+        for post_id, pub_date in posts.iterator()
+    )
+
+
+def prune(user, author):
+    """
+    Убирает из ленты пользователя посты автора после отписки.
+    """
+    TimelineEntry.objects.filter(user=user, post__author=author).delete()
+
+
+
+def rebuild(follows=None):
+    """
+    Заполняет ленты по подпискам одним запросом INSERT ... SELECT —
+    после bulk_create, который обходит сигналы. Готовые записи
+    не дублируются.
+    """
+    if follows is None:
+        follows = Follow.objects.all()
+    rows = follows.filter(author__posts__isnull=False).order_by().values_list(
+        'user_id', 'author__posts__id', 'author__posts__pub_date'
+    )
+    sql, params = rows.query.sql_with_params()
+    with connection.cursor() as cursor:
+        # У SELECT всегда есть WHERE: без него SQLite не разберёт
+        # ON CONFLICT после запроса.
+        cursor.execute(
+            f'INSERT INTO {TimelineEntry._meta.db_table} '
+            f'(user_id, post_id, pub_date) {sql} ON CONFLICT DO NOTHING',
+            params
+        )
+        return cursor.rowcount
@@ -0,0 +1,115 @@
+"""
+Приём картинок постов.
+
+Обработчики загрузки считают SHA-256 файла по мере его получения,
+а ingest() сохраняет картинку под именем из этого хэша: одинаковые
+файлы хранятся один раз и не обрабатываются повторно. Слишком
+большие снимки уменьшаются, метаданные (EXIF, XMP, комментарии)
+удаляются.
+"""
+import hashlib
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler, TemporaryFileUploadHandler
+)
+from PIL import Image, ImageOps
+
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'GIF': '.gif', 'WEBP': '.webp'}
+METADATA = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment', 'photoshop')
+CHUNK_SIZE = 64 * 1024
+
+
+class HashingUploadHandlerMixin:
+    """
+    Считает SHA-256 тех частей файла, которые принял сам обработчик.
+    """
+
+    def new_file(self, *args, **kwargs):
+        self.hasher = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        rest = super().receive_data_chunk(raw_data, start)
+        if rest is None:
+            self.hasher.update(raw_data)
+        return rest
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.hasher.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(HashingUploadHandlerMixin,
+                                     MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadHandlerMixin,
+                                        TemporaryFileUploadHandler):
+    pass
+
+
+def _digest(uploaded):
+    digest = getattr(uploaded, 'sha256', None)
+    if digest is None:
+        # Файл пришёл не через обработчики загрузки (тесты, код).
+        hasher = hashlib.sha256()
+        for chunk in uploaded.chunks(CHUNK_SIZE):
+            hasher.update(chunk)
+        digest = hasher.hexdigest()
+    return digest
+
+
+def _prepare(uploaded, image):
+    """
+    Содержимое для сохранения: исходные байты, если картинка
+    не слишком велика и без метаданных, иначе перекодированная копия.
+    """
+    limit = settings.POST_IMAGE_MAX_SIZE
+    oversized = max(image.size) > limit
+    has_metadata = any(key in image.info for key in METADATA)
+    if getattr(image, 'n_frames', 1) > 1 or not (oversized or has_metadata):
+        uploaded.seek(0)
+        return uploaded
+    image_format = image.format
+    if oversized:
+        # JPEG сразу декодируется в уменьшенном масштабе.
+        image.draft(image.mode, (limit, limit))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((limit, limit), Image.LANCZOS)
+    options = {}
+    if image_format == 'JPEG':
+        options = {'quality': settings.POST_IMAGE_QUALITY, 'optimize': True}
+    icc_profile = image.info.get('icc_profile')
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def ingest(uploaded, field):
+    """
+    Сохраняет загруженную картинку в хранилище поля и возвращает имя
+    файла. Повторная загрузка того же файла возвращает готовое имя.
+    """
+    uploaded.seek(0)
+    image = Image.open(uploaded)
+    extension = EXTENSIONS.get(image.format)
+    if extension is None:
+        extension = os.path.splitext(uploaded.name)[1].lower()
+    name = field.generate_filename(None, _digest(uploaded) + extension)
+    storage = field.storage
+    if storage.exists(name):
+        return name
+    saved = storage.save(name, _prepare(uploaded, image))
+    if saved != name:
+        # Тот же файл одновременно сохранил другой процесс.
+        storage.delete(saved)
+    return name
@@ -1,9 +1,37 @@
-from django.urls import path
+from django.urls import include, path
 from rest_framework.authtoken.views import obtain_auth_token
+from rest_framework.routers import DefaultRouter
 
-from . import views
+from . import api, views
+
+router = DefaultRouter()
+router.register('posts', api.PostViewSet, basename='api-posts')
+router.register('groups', api.GroupViewSet, basename='api-groups')
+
+api_urlpatterns = [
+    path('posts/<int:post_id>/comments/',
+         api.PostCommentsView.as_view(),
+         name='api-post-comments'),
+    path('feed/',
+         api.FeedView.as_view(),
+         name='api-feed'),
+    path('users/<str:username>/following/',
+         api.FollowListView.as_view(relation='following'),
+         name='api-following'),
+    path('users/<str:username>/followers/',
+         api.FollowListView.as_view(relation='followers'),
+         name='api-followers'),
+    path('token/',
+         obtain_auth_token,
+         name='api-token'),
+    path('', include(router.urls)),
+]
 
 urlpatterns = [
+    path('api/v1/', include(api_urlpatterns)),
+    path('api-token-auth/',
+         obtain_auth_token,
+         name='api-token-auth'),
     path('group/<slug:slug>/',
          views.group_posts,
          name='group_posts'),
@@ -13,6 +41,12 @@ urlpatterns = [
     path('follow/',
          views.follow_index,
          name='follow_index'),
+    path('search/',
+         views.search,
+         name='search'),
+    path('search/api/',
+         views.search_api,
+         name='search_api'),
     path('<str:username>/',
          views.profile,
          name='profile'),
@@ -22,6 +56,9 @@ urlpatterns = [
     path('<str:username>/<int:post_id>/edit/',
          views.post_edit,
          name='post_edit'),
+    path('<str:username>/<int:post_id>/comments/',
+         views.post_comments,
+         name='post_comments'),
     path('<username>/<int:post_id>/comment',
          views.add_comment,
          name='add_comment'),
@@ -35,6 +72,3 @@ urlpatterns = [
          views.index,
          name='index'),
 ]
-urlpatterns += [
-    path('api-token-auth/', obtain_auth_token)
-]
\ No newline at end of file
@@ -1,33 +1,38 @@
 from django.contrib.auth.decorators import login_required
-from django.core.cache import cache
-from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
-from django.views.decorators.cache import cache_page
-from rest_framework.decorators import api_view
-from rest_framework.response import Response
 
-from .forms import PostForm, CommentForm
-from .models import Post, Follow, Group, User
+from .caching import cache_feed, feed_etag
+from .forms import PostForm, CommentForm, SearchForm
+from .models import Comment, Post, Follow, Group, User
+from .paginators import CursorPaginator
 
 
-@cache_page(20, key_prefix='index_page')
+def _feed_page(request, post_list):
+    paginator = CursorPaginator(post_list, 10)
+    page = paginator.get_page(
+        request.GET.get('after'),
+        request.GET.get('before')
+    )
+    return paginator, page
+
+
+@feed_etag('posts')
+@cache_feed('posts')
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    paginator, page = _feed_page(request, Post.objects.for_feed())
     return render(request, "index.html", {
         'page': page,
         'paginator': paginator
     })
 
 
+@feed_etag('group:{slug}')
+@cache_feed('group:{slug}')
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    group_posts_list = group.posts.all()
-    paginator = Paginator(group_posts_list, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    paginator, page = _feed_page(request, group.posts.for_feed())
     return render(request, "group.html", {
         'group': group,
         'page': page,
@@ -36,6 +41,7 @@ def group_posts(request, slug):
 
 
 @login_required
+@transaction.atomic
 def new_post(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
     if not form.is_valid():
@@ -45,16 +51,17 @@ def new_post(request):
     post = form.save(commit=False)
     post.author = request.user
     post.save()
-    cache.touch('index_page', 0)
     return redirect('index')
 
 
+@feed_etag('profile:{username}')
+@cache_feed('profile:{username}')
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    author_posts = author.posts.all()
-    paginator = Paginator(author_posts, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    author = get_object_or_404(
+        User.objects.select_related('counters'),
+        username=username
+    )
+    paginator, page = _feed_page(request, author.posts.for_feed())
     following = request.user.is_authenticated and author.following.filter(
         user=request.user
     ).exists()
@@ -66,19 +73,53 @@ def profile(request, username):
     })
 
 
+def _comments(request, post_id):
+    """
+    Все комментарии поста (без выборки) и страница из них для показа.
+    """
+    comments = Comment.objects.filter(post_id=post_id).select_related(
+        'author'
+    )
+    paginator = CursorPaginator(comments, 20, ordering=('-created', '-id'))
+    return comments, paginator.get_page(request.GET.get('after'))
+
+
+@feed_etag('profile:{username}', csrf=True)
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post, id=post_id, author__username=username)
+    post = get_object_or_404(
+        Post.objects.for_feed().select_related('author__counters'),
+        id=post_id,
+        author__username=username
+    )
     author = post.author
     form = CommentForm()
-    comments = post.comments.all()
+    comments, comment_page = _comments(request, post.id)
     return render(request, 'post.html', {
         'post': post,
         'author': author,
         'comments': comments,
+        'comment_page': comment_page,
         'form': form
     })
 
 
+@feed_etag('profile:{username}', csrf=True)
+def post_comments(request, username, post_id):
+    """
+    Следующая порция комментариев — фрагмент для кнопки «Ещё».
+    """
+    post = get_object_or_404(
+        Post.objects.select_related('author'),
+        id=post_id,
+        author__username=username
+    )
+    comments, comment_page = _comments(request, post.id)
+    return render(request, 'comment_list.html', {
+        'post': post,
+        'comment_page': comment_page
+    })
+
+
 @login_required
 def post_edit(request, username, post_id):
     post = get_object_or_404(Post, id=post_id, author__username=username)
@@ -91,7 +132,6 @@ def post_edit(request, username, post_id):
     )
     if form.is_valid():
         form.save()
-        cache.touch('index_page', 0)
         return redirect('post', username, post_id)
     return render(request, 'newpost.html', {
         'form': form,
@@ -114,9 +154,13 @@ def server_error(request):
 
 @login_required
 def add_comment(request, username, post_id):
-    post = get_object_or_404(Post, id=post_id, author__username=username)
+    post = get_object_or_404(
+        Post.objects.for_feed().select_related('author__counters'),
+        id=post_id,
+        author__username=username
+    )
     author = post.author
-    comments = post.comments.all()
+    comments, comment_page = _comments(request, post.id)
     form = CommentForm(request.POST or None)
     if not form.is_valid():
         form = CommentForm()
@@ -124,6 +168,7 @@ def add_comment(request, username, post_id):
             'post': post,
             'author': author,
             'comments': comments,
+            'comment_page': comment_page,
             'form': form
         })
     comment = form.save(commit=False)
@@ -133,19 +178,80 @@ def add_comment(request, username, post_id):
     return redirect('post', username, post_id)
 
 
+def _follow_page(request):
+    paginator = CursorPaginator(
+        request.user.timeline.for_feed(),
+        10,
+        ordering=('-pub_date', '-post_id')
+    )
+    page = paginator.get_page(
+        request.GET.get('after'),
+        request.GET.get('before')
+    )
+    for entry in page.object_list:
+        entry.post.comment_count = entry.comment_count
+    page.object_list = [entry.post for entry in page.object_list]
+    return paginator, page
+
+
 @login_required
+@feed_etag('posts', 'follow:{user}')
+@cache_feed('posts', 'follow:{user}')
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    paginator, page = _follow_page(request)
     return render(request, "follow.html", {
         'page': page,
         'paginator': paginator
     })
 
 
+def _search_page(request):
+    form = SearchForm(request.GET or None)
+    paginator = CursorPaginator(form.search(), 10, ordering=('rank', '-id'))
+    page = paginator.get_page(
+        request.GET.get('after'),
+        request.GET.get('before')
+    )
+    return form, paginator, page
+
+
+def search(request):
+    form, paginator, page = _search_page(request)
+    # Ссылки паджинатора сохраняют параметры поиска.
+    query = request.GET.copy()
+    query.pop('after', None)
+    query.pop('before', None)
+    return render(request, 'search.html', {
+        'form': form,
+        'page': page,
+        'paginator': paginator,
+        'query': query.urlencode(),
+    })
+
+
+def search_api(request):
+    form, paginator, page = _search_page(request)
+    if form.errors:
+        return JsonResponse({'errors': form.errors}, status=400)
+    return JsonResponse({
+        'results': [
+            {
+                'id': post.id,
+                'text': post.text,
+                'author': post.author.username,
+                'group': post.group and post.group.slug,
+                'pub_date': post.pub_date,
+                'rank': post.rank,
+            }
+            for post in page
+        ],
+        'previous': page.previous_cursor,
+        'next': page.next_cursor,
+    })
+
+
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     following = author.following.filter(user=request.user).exists()
@@ -155,15 +261,10 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
     unfollow = get_object_or_404(Follow, user=request.user, author=author)
     unfollow.delete()
     return redirect('profile', username)
 
-
-@api_view(['GET', 'POST'])
-def obtain_auth_token(request):
-    if request.method == 'POST':
-        return Response({'message': f'Привет {request.data}'})
-    return Response({'message': 'Привет, мир!'})
\ No newline at end of file
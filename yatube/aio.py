@@ -0,0 +1,42 @@
+"""
+Синхронный код (ORM, шаблоны) в асинхронных представлениях.
+
+run() выполняет функцию в общем пуле из ASYNC_DB_WORKERS потоков:
+независимые запросы одной страницы идут одновременно, а число
+соединений с базой на процесс не превышает размера пула. У каждого
+потока пула своё соединение; оно проверяется и закрывается по тем же
+правилам, что и соединение обычного запроса (yatube.db).
+"""
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import db
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_DB_WORKERS,
+    thread_name_prefix='async-db'
+)
+
+
+def _call(func, args, kwargs):
+    db.checkout()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+        db.release()
+
+
+async def run(func, *args, **kwargs):
+    # Контекст (язык, замеры запроса) переходит в поток пула.
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor,
+        functools.partial(context.run, _call, func, args, kwargs)
+    )
+
@@ -0,0 +1,26 @@
+"""
+ASGI config for yatube project.
+
+Ленты, профиль и страница поста здесь асинхронные (yatube.asgi_urls).
+Основная точка входа — yatube/wsgi.py: по замерам
+manage.py benchmark --asgi эта пока медленнее на всех страницах.
+Пробный запуск: uvicorn yatube.asgi:application --workers 4
+"""
+
+import os
+
+from asgiref.sync import ThreadSensitiveContext
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+os.environ.setdefault('ROOT_URLCONF', 'yatube.asgi_urls')
+
+django_application = get_asgi_application()
+
+
+async def application(scope, receive, send):
+    # Django 3.1 выполняет синхронный код всех запросов (middleware,
+    # синхронные представления) в одном общем потоке; так у каждого
+    # запроса свой поток.
+    async with ThreadSensitiveContext():
+        await django_application(scope, receive, send)
@@ -0,0 +1,42 @@
+"""
+Адреса для ASGI: те же, что в yatube.urls, но ленты, профиль и
+страницу поста обслуживают асинхронные представления.
+"""
+from django.urls import URLPattern, URLResolver
+
+from posts import async_views, views
+
+from .urls import handler404, handler500 # noqa
+from .urls import urlpatterns as sync_urlpatterns
+
+ASYNC_VIEWS = {
+    views.index: async_views.index,
+    views.group_posts: async_views.group_posts,
+    views.profile: async_views.profile,
+    views.post_view: async_views.post_view,
+    views.follow_index: async_views.follow_index,
+}
+
+
+def _replace(patterns):
+    # Порядок адресов важен, поэтому представления меняются на месте.
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            pattern = URLResolver(
+                pattern.pattern,
+                list(_replace(pattern.url_patterns)),
+                pattern.default_kwargs,
+                pattern.app_name,
+                pattern.namespace
+            )
+        elif pattern.callback in ASYNC_VIEWS:
+            pattern = URLPattern(
+                pattern.pattern,
+                ASYNC_VIEWS[pattern.callback],
+                pattern.default_args,
+                pattern.name
+            )
+        yield pattern
+
+
+urlpatterns = list(_replace(sync_urlpatterns))
@@ -0,0 +1,457 @@
+"""
+Двухуровневый кэш: небольшой LRU в памяти процесса (L1) перед общим
+для всех воркеров хранилищем (L2).
+
+SQLiteCache — общее хранилище в файле SQLite, не требующее отдельного
+сервера. Помимо значений оно ведёт журнал инвалидаций: каждая запись
+через TwoTierCache публикует изменённые ключи, а остальные процессы
+периодически читают журнал и выбрасывают эти ключи из своего L1.
+"""
+import contextvars
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+# Маркер в журнале, означающий «очистить L1 целиком».
+CLEAR_ALL = '*'
+
+# Обращения к кэшу за текущий запрос ({'l1': .., 'l2': .., 'miss': ..}),
+# см. yatube.metrics. Контекст доходит и до потоков, где выполняется
+# код запроса.
+request_hits = contextvars.ContextVar('cache_request_hits', default=None)
+
+
+class SQLiteCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+    cull_every = 100
+    log_retention = 300
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self._path,
+                timeout=5,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)'
+            )
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS invalidations ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, '
+                'origin TEXT NOT NULL, created REAL NOT NULL)'
+            )
+            self._local.connection = connection
+        return connection
+
+    def _expiry(self, timeout):
+        timeout = self.get_backend_timeout(timeout)
+        return None if timeout is None else time.time() + timeout
+
+    def _dumps(self, value):
+        return pickle.dumps(value, self.pickle_protocol)
+
+    def _fetch(self, keys):
+        if not keys:
+            return {}
+        now = time.time()
+        rows = self._connection().execute(
+            f'SELECT key, value, expires FROM cache '
+            f'WHERE key IN ({",".join("?" * len(keys))})',
+            keys
+        ).fetchall()
+        return {
+            key: value for key, value, expires in rows
+            if expires is None or expires > now
+        }
+
+    def get_raw(self, key, version=None):
+        """
+        Значение в сериализованном виде — для L1, который хранит байты.
+        """
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return self._fetch([key]).get(key)
+
+    def get(self, key, default=None, version=None):
+        raw = self.get_raw(key, version=version)
+        return default if raw is None else pickle.loads(raw)
+
+    def get_many(self, keys, version=None):
+        made = {self.make_key(key, version=version): key for key in keys}
+        for key in made:
+            self.validate_key(key)
+        return {
+            made[key]: pickle.loads(raw)
+            for key, raw in self._fetch(list(made)).items()
+        }
+
+    def _write(self, sql, params):
+        self._connection().execute(sql, params)
+        self._writes += 1
+        if self._writes % self.cull_every == 0:
+            self._cull()
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self._write(
+            'INSERT OR REPLACE INTO cache (key, value, expires) '
+            'VALUES (?, ?, ?)',
+            (key, self._dumps(value), self._expiry(timeout))
+        )
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(
+                'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                (key, time.time())
+            )
+            cursor = connection.execute(
+                'INSERT OR IGNORE INTO cache (key, value, expires) '
+                'VALUES (?, ?, ?)',
+                (key, self._dumps(value), self._expiry(timeout))
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return cursor.rowcount == 1
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        cursor = self._connection().execute(
+            'UPDATE cache SET expires = ? '
+            'WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self._expiry(timeout), key, time.time())
+        )
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            raw = self._fetch([key]).get(key)
+            if raw is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(raw) + delta
+            connection.execute(
+                'UPDATE cache SET value = ? WHERE key = ?',
+                (self._dumps(value), key)
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return value
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        cursor = self._connection().execute(
+            'DELETE FROM cache WHERE key = ?', (key,)
+        )
+        return cursor.rowcount == 1
+
+    def has_key(self, key, version=None):
+        return self.get_raw(key, version=version) is not None
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache')
+
+    def _cull(self):
+        connection = self._connection()
+        connection.execute(
+            'DELETE FROM cache WHERE expires <= ?', (time.time(),)
+        )
+        connection.execute(
+            'DELETE FROM invalidations WHERE created < ?',
+            (time.time() - self.log_retention,)
+        )
+        count = connection.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count > self._max_entries:
+            connection.execute(
+                'DELETE FROM cache WHERE rowid IN ('
+                'SELECT rowid FROM cache ORDER BY rowid LIMIT ?)',
+                (count // self._cull_frequency,)
+            )
+
+    # Журнал инвалидаций для L1 других процессов.
+
+    def publish_invalidation(self, keys, origin):
+        now = time.time()
+        self._connection().executemany(
+            'INSERT INTO invalidations (key, origin, created) '
+            'VALUES (?, ?, ?)',
+            [(key, origin, now) for key in keys]
+        )
+
+    def last_invalidation(self):
+        row = self._connection().execute(
+            'SELECT MAX(id) FROM invalidations'
+        ).fetchone()
+        return row[0] or 0
+
+    def invalidations_since(self, last_id):
+        return self._connection().execute(
+            'SELECT id, key, origin FROM invalidations '
+            'WHERE id > ? ORDER BY id',
+            (last_id,)
+        ).fetchall()
+
+    def close(self, **kwargs):
+        # Соединения живут в потоках и переиспользуются между запросами.
+        pass
+
+
+class _LocalTier:
+    """
+    L1 одного процесса. Общий для всех потоков: django.core.cache
+    создаёт экземпляр бэкенда на поток, а L1 должен быть один.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.origin = uuid.uuid4().hex
+        self.entries = OrderedDict()
+        self.hits = {'l1': 0, 'l2': 0, 'miss': 0}
+        self.next_poll = 0
+        self.last_invalidation = None
+
+    def check_fork(self):
+        # После fork() потомок не должен делить origin и данные с родителем.
+        if self.pid != os.getpid():
+            with self.lock:
+                if self.pid != os.getpid():
+                    self.reset()
+
+
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+
+class TwoTierCache(BaseCache):
+    """
+    OPTIONS:
+      SHARED — настройки общего бэкенда (BACKEND, LOCATION, OPTIONS);
+      L1_MAX_ENTRIES — размер LRU в процессе;
+      L1_TIMEOUT — наибольшее время жизни записи в L1, секунд;
+      POLL_INTERVAL — как часто читать журнал инвалидаций, секунд.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        shared = dict(options.get('SHARED', {}))
+        backend = shared.pop('BACKEND', 'yatube.cache.SQLiteCache')
+        shared_location = shared.pop('LOCATION', location)
+        for name in ('KEY_PREFIX', 'VERSION', 'KEY_FUNCTION', 'TIMEOUT'):
+            if name in params:
+                shared.setdefault(name, params[name])
+        self.shared = import_string(backend)(shared_location, shared)
+        self.l1_timeout = float(options.get('L1_TIMEOUT', 60))
+        self.poll_interval = float(options.get('POLL_INTERVAL', 0.5))
+        self.broadcast = hasattr(self.shared, 'publish_invalidation')
+        with _tiers_lock:
+            self._tier = _tiers.setdefault(
+                (backend, shared_location),
+                _LocalTier(int(options.get('L1_MAX_ENTRIES', 1000)))
+            )
+
+    @property
+    def hits(self):
+        return self._tier.hits
+
+    def _count(self, kind, number=1):
+        # Счётчики общие для потоков пула и фоновых воркеров.
+        with self._tier.lock:
+            self._tier.hits[kind] += number
+            hits = request_hits.get()
+            if hits is not None:
+                hits[kind] += number
+
+    # L1
+
+    def _l1_get(self, key):
+        tier = self._tier
+        with tier.lock:
+            entry = tier.entries.get(key)
+            if entry is None:
+                return None
+            raw, expires = entry
+            if expires <= time.monotonic():
+                del tier.entries[key]
+                return None
+            tier.entries.move_to_end(key)
+            return raw
+
+    def _l1_set(self, key, raw, timeout=DEFAULT_TIMEOUT):
+        timeout = self.get_backend_timeout(timeout)
+        lifetime = self.l1_timeout
+        if timeout is not None:
+            lifetime = min(lifetime, timeout)
+        tier = self._tier
+        with tier.lock:
+            tier.entries[key] = (raw, time.monotonic() + lifetime)
+            tier.entries.move_to_end(key)
+            while len(tier.entries) > tier.max_entries:
+                tier.entries.popitem(last=False)
+
+    def _l1_discard(self, keys):
+        tier = self._tier
+        with tier.lock:
+            for key in keys:
+                tier.entries.pop(key, None)
+
+    def _l1_clear(self):
+        with self._tier.lock:
+            self._tier.entries.clear()
+
+    def _poll(self):
+        tier = self._tier
+        tier.check_fork()
+        if not self.broadcast or time.monotonic() < tier.next_poll:
+            return
+        tier.next_poll = time.monotonic() + self.poll_interval
+        last = tier.last_invalidation
+        if last is None:
+            tier.last_invalidation = self.shared.last_invalidation()
+            return
+        rows = self.shared.invalidations_since(last)
+        if not rows:
+            return
+        foreign = [key for _, key, origin in rows if origin != tier.origin]
+        if rows[0][0] != last + 1 or CLEAR_ALL in foreign:
+            # Либо часть журнала уже удалена и неизвестно, что пропущено,
+            # либо кто-то очистил кэш целиком.
+            self._l1_clear()
+        else:
+            self._l1_discard(foreign)
+        tier.last_invalidation = max(last, rows[-1][0])
+
+    def _publish(self, keys):
+        if self.broadcast:
+            self.shared.publish_invalidation(keys, self._tier.origin)
+
+    # API кэша
+
+    def _get_raw(self, key, version):
+        made = self.make_key(key, version=version)
+        self._poll()
+        raw = self._l1_get(made)
+        if raw is not None:
+            self._count('l1')
+            return raw
+        raw = self.shared.get_raw(key, version=version)
+        if raw is None:
+            self._count('miss')
+            return None
+        self._count('l2')
+        self._l1_set(made, raw)
+        return raw
+
+    def get(self, key, default=None, version=None):
+        raw = self._get_raw(key, version)
+        return default if raw is None else pickle.loads(raw)
+
+    def get_many(self, keys, version=None):
+        self._poll()
+        found, missing = {}, []
+        for key in keys:
+            raw = self._l1_get(self.make_key(key, version=version))
+            if raw is None:
+                missing.append(key)
+            else:
+                found[key] = pickle.loads(raw)
+        self._count('l1', len(found))
+        if missing:
+            shared = self.shared.get_many(missing, version=version)
+            self._count('l2', len(shared))
+            self._count('miss', len(missing) - len(shared))
+            for key, value in shared.items():
+                self._l1_set(
+                    self.make_key(key, version=version),
+                    pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+                )
+            found.update(shared)
+        return found
+
+    def has_key(self, key, version=None):
+        return self._get_raw(key, version) is not None
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        made = self.make_key(key, version=version)
+        self.shared.set(key, value, timeout, version=version)
+        self._l1_set(
+            made,
+            pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+            timeout
+        )
+        self._publish([made])
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            made = self.make_key(key, version=version)
+            self._l1_discard([made])
+            self._publish([made])
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._l1_discard([self.make_key(key, version=version)])
+        return self.shared.touch(key, timeout, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        made = self.make_key(key, version=version)
+        value = self.shared.incr(key, delta, version=version)
+        self._l1_set(made, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        self._publish([made])
+        return value
+
+    def delete(self, key, version=None):
+        made = self.make_key(key, version=version)
+        self._l1_discard([made])
+        deleted = self.shared.delete(key, version=version)
+        self._publish([made])
+        return deleted
+
+    def clear(self):
+        self._l1_clear()
+        self.shared.clear()
+        self._publish([CLEAR_ALL])
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
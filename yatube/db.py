@@ -0,0 +1,86 @@
+"""
+Постоянные соединения с базой.
+
+Соединение живёт CONN_MAX_AGE секунд и служит многим запросам. В начале
+очередного запроса такое соединение проверяется (is_usable, у PostgreSQL
+— SELECT 1) и при неудаче закрывается: первый запрос к базе откроет
+новое, как CONN_HEALTH_CHECKS в Django 4.1. Процесс
+держит не больше DATABASE_POOL_SIZE постоянных соединений на базу:
+соединения остальных потоков закрываются в конце запроса.
+
+checkout() и release() вызываются по сигналам начала и конца запроса
+в том потоке, где выполняется его синхронный код (и под WSGI, и под
+ASGI), а также вокруг каждого вызова в пуле yatube.aio.
+
+Открытия, повторные использования и неудачные проверки считаются
+в yatube_db_connections_total на /metrics/.
+"""
+import threading
+import weakref
+
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import metrics
+from .metrics import CONNECTION_COUNTER, registry
+
+_kept = {}
+_kept_lock = threading.Lock()
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    registry.increment(CONNECTION_COUNTER, connection.alias, 'open')
+
+
+def checkout():
+    """
+    Начало запроса: открытые соединения потока, пережившие прошлый
+    запрос, проверяются, неисправные закрываются.
+    """
+    for connection in connections.all():
+        if connection.connection is not None:
+            if settings.DATABASE_HEALTH_CHECKS \
+                    and not connection.is_usable():
+                registry.increment(
+                    CONNECTION_COUNTER, connection.alias, 'failure'
+                )
+                connection.close()
+            else:
+                registry.increment(
+                    CONNECTION_COUNTER, connection.alias, 'reuse'
+                )
+        metrics.track(connection)
+
+
+def release():
+    """
+    Конец запроса: соединение остаётся открытым, только если
+    в процессе ещё нет DATABASE_POOL_SIZE постоянных соединений.
+    """
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        with _kept_lock:
+            kept = _kept.setdefault(connection.alias, weakref.WeakSet())
+            for other in list(kept):
+                if other.connection is None:
+                    kept.discard(other)
+            if connection in kept \
+                    or len(kept) < settings.DATABASE_POOL_SIZE:
+                kept.add(connection)
+                continue
+        connection.close()
+
+
+@receiver(request_started)
+def request_started_handler(sender, **kwargs):
+    checkout()
+
+
+@receiver(request_finished)
+def request_finished_handler(sender, **kwargs):
+    release()
@@ -0,0 +1,373 @@
+"""
+Метрики запросов: время ответа, SQL, шаблоны и кэш по имени адреса.
+
+Время шаблонов замеряет бэкенд TimedTemplates из TEMPLATES. При
+SERVER_TIMING (по умолчанию — при DEBUG) ответ получает заголовок
+Server-Timing. Замеры копятся
+в памяти процесса под одной короткой блокировкой на запрос и раз
+в METRICS_FLUSH_INTERVAL секунд сбрасываются в свой файл процесса
+в METRICS_DIR. Страница /metrics/ складывает файлы всех процессов
+и отдаёт их в текстовом формате Prometheus.
+"""
+import contextvars
+import glob
+import hmac
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.template.backends import django as django_backend
+
+from .cache import request_hits
+
+SECONDS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERIES = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+HISTOGRAMS = {
+    'yatube_request_duration_seconds': (
+        'Время ответа', SECONDS
+    ),
+    'yatube_db_duration_seconds': (
+        'Суммарное время SQL-запросов за запрос', SECONDS
+    ),
+    'yatube_db_queries': (
+        'Число SQL-запросов за запрос', QUERIES
+    ),
+    'yatube_template_duration_seconds': (
+        'Время отрисовки шаблонов за запрос', SECONDS
+    ),
+}
+CACHE_COUNTER = 'yatube_cache_lookups_total'
+CONNECTION_COUNTER = 'yatube_db_connections_total'
+# Имя счётчика: описание и имена меток.
+COUNTERS = {
+    CACHE_COUNTER: (
+        'Обращения к кэшу по результату', ('view', 'result')
+    ),
+    CONNECTION_COUNTER: (
+        'Соединения с базой: открытые, использованные повторно '
+        'и не прошедшие проверку', ('alias', 'event')
+    ),
+}
+
+_current = contextvars.ContextVar('request_stats', default=None)
+_template_depth = contextvars.ContextVar('template_depth', default=0)
+
+
+class RequestStats:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        # Асинхронные представления выполняют запросы в нескольких
+        # потоках сразу (yatube.aio).
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper: время каждого SQL-запроса.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.db_time += elapsed
+                self.queries += 1
+
+
+def _execute(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def track(connection):
+    """
+    Учитывает SQL-запросы соединения в замерах текущего запроса,
+    в каком бы потоке они ни выполнялись. Вызывается из
+    yatube.db.checkout() в начале каждого запроса.
+    """
+    if _execute not in connection.execute_wrappers:
+        # В начало списка: execute_wrapper() снимает обёртки с конца.
+        connection.execute_wrappers.insert(0, _execute)
+
+
+class TimedTemplate(django_backend.Template):
+
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(context, request)
+        # Вложенные шаблоны (render_to_string в тегах) уже учтены
+        # во времени внешнего.
+        depth = _template_depth.set(_template_depth.get() + 1)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            _template_depth.reset(depth)
+            if _template_depth.get() == 0:
+                with stats.lock:
+                    stats.template_time += time.perf_counter() - started
+
+
+class TimedTemplates(django_backend.DjangoTemplates):
+    """
+    Шаблоны Django, время отрисовки которых попадает в замеры
+    запроса. Включается в TEMPLATES вместо DjangoTemplates.
+    """
+
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return TimedTemplate(template.template, self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+class _Registry:
+    """
+    Накопленные замеры процесса: гистограммы и счётчики по меткам.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.histograms = {}
+        self.counters = {}
+        self.next_flush = 0
+
+    def _check_pid(self):
+        if self.pid != os.getpid():
+            # Потомок после fork() не должен повторять данные родителя.
+            self.reset()
+
+    def increment(self, name, *labels):
+        key = '\x1f'.join((name, *labels))
+        with self.lock:
+            self._check_pid()
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def record(self, view, observations, cache_hits):
+        with self.lock:
+            self._check_pid()
+            for name, value in observations.items():
+                buckets = HISTOGRAMS[name][1]
+                key = f'{name}\x1f{view}'
+                series = self.histograms.get(key)
+                if series is None:
+                    # Счётчики корзин, затем сумма значений.
+                    series = self.histograms[key] = [0] * (len(buckets) + 2)
+                series[bisect_left(buckets, value)] += 1
+                series[-1] += value
+            for result, count in cache_hits.items():
+                if count:
+                    key = f'{CACHE_COUNTER}\x1f{view}\x1f{result}'
+                    self.counters[key] = self.counters.get(key, 0) + count
+            due = time.monotonic() >= self.next_flush
+            if due:
+                self.next_flush = (
+                    time.monotonic() + settings.METRICS_FLUSH_INTERVAL
+                )
+                snapshot = self._snapshot()
+        if due:
+            _write(snapshot)
+
+    def _snapshot(self):
+        return {
+            'histograms': {
+                key: list(series) for key, series in self.histograms.items()
+            },
+            'counters': dict(self.counters),
+        }
+
+    def flush(self):
+        with self.lock:
+            snapshot = self._snapshot()
+        _write(snapshot)
+
+
+registry = _Registry()
+
+
+def _write(snapshot):
+    # Файл у процесса свой, замена атомарна: читатели и другие
+    # процессы не видят недописанных данных и не ждут блокировок.
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    path = os.path.join(settings.METRICS_DIR, f'metrics-{os.getpid()}.json')
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as output:
+        json.dump(snapshot, output)
+    os.replace(temporary, path)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _expired(path):
+    """
+    Файл завершившегося процесса, который не обновлялся дольше
+    METRICS_RETENTION секунд: его замеры больше не нужны.
+    """
+    try:
+        pid = int(os.path.basename(path)[len('metrics-'):-len('.json')])
+        age = time.time() - os.path.getmtime(path)
+    except (OSError, ValueError):
+        return False
+    return age > settings.METRICS_RETENTION and not _alive(pid)
+
+
+def collect():
+    """
+    Сумма замеров всех процессов из файлов METRICS_DIR. Старые файлы
+    завершившихся процессов удаляются.
+    """
+    histograms, counters = {}, {}
+    pattern = os.path.join(settings.METRICS_DIR, 'metrics-*.json')
+    for path in glob.glob(pattern):
+        if _expired(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path) as source:
+                snapshot = json.load(source)
+        except (OSError, ValueError):
+            continue
+        for key, series in snapshot['histograms'].items():
+            total = histograms.setdefault(key, [0] * len(series))
+            for index, value in enumerate(series):
+                total[index] += value
+        for key, value in snapshot['counters'].items():
+            counters[key] = counters.get(key, 0) + value
+    return histograms, counters
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def render_prometheus(histograms, counters):
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for key in sorted(histograms):
+            metric, view = key.split('\x1f')
+            if metric != name:
+                continue
+            series = histograms[key]
+            labels = f'view="{_label(view)}"'
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), series):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            lines.append(f'{name}_sum{{{labels}}} {series[-1]}')
+            lines.append(f'{name}_count{{{labels}}} {cumulative}')
+    for name, (help_text, label_names) in COUNTERS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for key in sorted(counters):
+            metric, *values = key.split('\x1f')
+            if metric != name:
+                continue
+            labels = ','.join(
+                f'{label}="{_label(value)}"'
+                for label, value in zip(label_names, values)
+            )
+            lines.append(f'{name}{{{labels}}} {counters[key]}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics(request):
+    """
+    Страница для Prometheus. Нужен заголовок Authorization: Bearer
+    <METRICS_TOKEN>. Доступ без токена с адресов INTERNAL_IPS включается
+    явно (METRICS_ALLOW_INTERNAL_IPS): за локальным прокси это любой
+    клиент.
+    """
+    token = settings.METRICS_TOKEN
+    allowed = bool(token) and hmac.compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    )
+    if not allowed and settings.METRICS_ALLOW_INTERNAL_IPS:
+        allowed = request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS
+    if not allowed:
+        return HttpResponseForbidden()
+    registry.flush()
+    return HttpResponse(
+        render_prometheus(*collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+def server_timing(stats, cache_hits, total):
+    cache = ' '.join(
+        f'{result}={count}' for result, count in cache_hits.items()
+    )
+    return ', '.join([
+        f'db;desc="{stats.queries} SQL";dur={stats.db_time * 1000:.1f}',
+        f'tpl;dur={stats.template_time * 1000:.1f}',
+        f'cache;desc="{cache}"',
+        f'total;dur={total * 1000:.1f}',
+    ])
+
+
+class MetricsMiddleware:
+    """
+    Ставится первым в MIDDLEWARE, чтобы время ответа включало
+    остальные middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        cache_hits = {'l1': 0, 'l2': 0, 'miss': 0}
+        # Контекстные переменные: их видят и потоки пула yatube.aio.
+        stats_token = _current.set(stats)
+        hits_token = request_hits.set(cache_hits)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(stats_token)
+            request_hits.reset(hits_token)
+        total = time.perf_counter() - stats.started
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        registry.record(view, {
+            'yatube_request_duration_seconds': total,
+            'yatube_db_duration_seconds': stats.db_time,
+            'yatube_db_queries': stats.queries,
+            'yatube_template_duration_seconds': stats.template_time,
+        }, cache_hits)
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = server_timing(
+                stats, cache_hits, total
+            )
+        return response
+
@@ -0,0 +1,89 @@
+"""
+Чтение с реплик базы и запись в основную.
+
+ReplicaMiddleware выбирает для безопасного запроса (GET, HEAD) одну
+из DATABASE_REPLICAS, и все его чтения идут на неё. Запросы, меняющие
+данные, а также команды и фоновые задачи работают только с основной
+базой. После запроса, меняющего данные, клиент получает куку и ещё
+REPLICA_PIN_SECONDS секунд читает из основной базы: так он видит свой
+пост или комментарий, даже если реплика отстаёт.
+"""
+import contextvars
+import random
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'db-primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_alias = contextvars.ContextVar('read_alias', default=None)
+
+
+def reading_replica():
+    """Чтения текущего запроса идут на реплику."""
+    return _read_alias.get() is not None
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        # None — решает Django: база экземпляра из подсказок или основная.
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплики получают схему вместе с данными с основной базы.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """
+    Ставится последним в MIDDLEWARE. Под ASGI синхронное последнее звено
+    заставляет Django 3.1 переключить поток один раз на всю цепочку,
+    а не по разу на каждый хук стандартных middleware. Контекст с
+    выбранной базой доходит и до асинхронного представления, и до
+    потоков пула yatube.aio.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _read_alias.set(self.read_alias(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        return self.pin(request, response)
+
+    def read_alias(self, request):
+        replicas = settings.DATABASE_REPLICAS
+        # Кука, а не сессия: сессия сама читается из базы, и только что
+        # записанной сессии на реплике может ещё не быть.
+        if replicas and request.method in SAFE_METHODS \
+                and PIN_COOKIE not in request.COOKIES:
+            return random.choice(replicas)
+        return None
+
+    def pin(self, request, response):
+        if settings.DATABASE_REPLICAS \
+                and request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
@@ -12,23 +12,41 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 
 import environ
 import os
+import tempfile
 import sentry_sdk
 from sentry_sdk.integrations.django import DjangoIntegration
 
+from yatube.tracing import Sampler
+
+env = environ.Env()
+environ.Env.read_env()
+
+# Трассируется доля запросов, медленные и с ошибками — всегда;
+# см. yatube/tracing.py
+TRACES_SAMPLER = Sampler(
+    rate=env.float('TRACES_SAMPLE_RATE', default=0.05),
+    rates=env.dict('TRACES_ROUTE_RATES', default={}),
+    record_rate=env.float('TRACES_RECORD_RATE', default=0.2),
+    slow_ms=env.int('TRACES_SLOW_MS', default=500),
+    per_second=env.float('TRACES_PER_SECOND', default=5),
+    skip=env.list(
+        'TRACES_SKIP_PREFIXES',
+        default=['/static/', '/media/', '/metrics/']
+    ),
+)
+
 sentry_sdk.init(
     dsn="https://8f69f9be06294151ac733fbd82c9f372@o557808.ingest.sentry.io/5690530",
     integrations=[DjangoIntegration()],
 
-    traces_sample_rate=1.0,
+    traces_sampler=TRACES_SAMPLER.traces_sampler,
+    before_send_transaction=TRACES_SAMPLER.before_send_transaction,
 
     # If you wish to associate users to errors (assuming you are using
     # django.contrib.auth) you may enable sending PII data.
     send_default_pii=True
 )
 
-env = environ.Env()
-environ.Env.read_env()
-
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 SECRET_KEY = '5zc8dyucuw-a6yzznbu!fwpl+#dn6pynipl-7p=(o!s%3w7%l*'
@@ -43,6 +61,7 @@ ALLOWED_HOSTS = [
 ]
 
 INSTALLED_APPS = [
+    'yatube.apps.YatubeConfig',
     'users',
     'posts',
     'django.contrib.sites',
@@ -54,11 +73,12 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'sorl.thumbnail',
-    'debug_toolbar',
+    'rest_framework',
     'rest_framework.authtoken'
 ]
 
 MIDDLEWARE = [
+    'yatube.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,18 +86,24 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
+    # Синхронный и последний: см. yatube/replicas.py
+    'yatube.replicas.ReplicaMiddleware',
 ]
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
 
 INTERNAL_IPS = [
     '127.0.0.1'
 ]
 
-ROOT_URLCONF = 'yatube.urls'
+# yatube/asgi.py подставляет адреса с асинхронными представлениями.
+ROOT_URLCONF = env.str('ROOT_URLCONF', default='yatube.urls')
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates с замером времени отрисовки (yatube/metrics.py)
+        'BACKEND': 'yatube.metrics.TimedTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -94,9 +120,40 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# Соединение с базой служит запросам столько секунд (yatube.db)
+CONN_MAX_AGE = env.int('DATABASE_CONN_MAX_AGE', default=60)
+# Проверять повторно используемое соединение перед первым запросом
+DATABASE_HEALTH_CHECKS = env.bool('DATABASE_HEALTH_CHECKS', default=True)
+# Постоянных соединений с каждой базой на процесс не больше
+DATABASE_POOL_SIZE = env.int('DATABASE_POOL_SIZE', default=10)
+
 DATABASES = {
     'default': env.db(),
 }
+DATABASES['default'].setdefault('CONN_MAX_AGE', CONN_MAX_AGE)
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Фоновые потоки (posts.thumbnails) пишут в базу одновременно
+    # с запросом. В общей базе в памяти блокировки не ждут, а сразу
+    # падают, поэтому тестовая база SQLite — файл.
+    DATABASES['default'].setdefault('TEST', {
+        'NAME': os.path.join(BASE_DIR, 'test.sqlite3'),
+    })
+
+# Реплики только для чтения: DATABASE_REPLICA_URLS=postgres://...,...
+# Запросы GET читают с них (yatube.replicas), в тестах они —
+# зеркала основной базы.
+DATABASE_REPLICAS = []
+for number, url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[])):
+    alias = f'replica{number + 1}'
+    DATABASES[alias] = {
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        **environ.Env.db_url_config(url),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['yatube.replicas.ReplicaRouter']
+# Столько секунд после записи клиент читает из основной базы
+REPLICA_PIN_SECONDS = env.int('REPLICA_PIN_SECONDS', default=10)
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -129,6 +186,15 @@ STATIC_URL = '/static/'
 MEDIA_ROOT = os.path.join(BASE_DIR, '/media')
 MEDIA_URL = '/media/'
 
+# Загрузки хэшируются на лету, см. posts.uploads
+FILE_UPLOAD_HANDLERS = [
+    'posts.uploads.HashingMemoryFileUploadHandler',
+    'posts.uploads.HashingTemporaryFileUploadHandler',
+]
+# Наибольшая сторона хранимой картинки поста и качество JPEG
+POST_IMAGE_MAX_SIZE = env.int('POST_IMAGE_MAX_SIZE', default=2048)
+POST_IMAGE_QUALITY = env.int('POST_IMAGE_QUALITY', default=85)
+
 # Login
 
 LOGIN_URL = 'login'
@@ -143,19 +209,67 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
 SITE_ID = 1
 
+# Тесты берут свой файл: yatube/settings_test.py
+CACHE_LOCATION = env(
+    'CACHE_LOCATION',
+    default=os.path.join(BASE_DIR, 'cache.sqlite3')
+)
+
+# L1 в памяти воркера перед общим SQLite-кэшем; см. yatube/cache.py
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'yatube.cache.TwoTierCache',
+        'OPTIONS': {
+            'SHARED': {
+                'BACKEND': 'yatube.cache.SQLiteCache',
+                'LOCATION': CACHE_LOCATION,
+                'OPTIONS': {'MAX_ENTRIES': 100000},
+            },
+            'L1_MAX_ENTRIES': env.int('CACHE_L1_MAX_ENTRIES', default=1000),
+            'L1_TIMEOUT': 60,
+            'POLL_INTERVAL': 0.5,
+        },
     }
 }
 
+# Время жизни страниц лент; устаревание обеспечивают версии в posts.caching
+FEED_CACHE_TIMEOUT = env.int('FEED_CACHE_TIMEOUT', default=60 * 15)
+
+# Потоки фоновой нарезки миниатюр в каждом процессе (posts.thumbnails)
+THUMBNAIL_WORKERS = env.int('THUMBNAIL_WORKERS', default=2)
+
+# Потоки для запросов к базе и шаблонов асинхронных представлений
+# в каждом процессе ASGI (yatube.aio) — не больше стольких соединений
+ASYNC_DB_WORKERS = env.int('ASYNC_DB_WORKERS', default=8)
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
-    ]
+        'posts.authentication.CachedTokenAuthentication',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'posts.pagination.KeysetPagination',
+    'PAGE_SIZE': 10,
 }
 
+# Метрики запросов (yatube/metrics.py): файлы процессов для /metrics/,
+# период их записи, сколько хранить файлы завершившихся процессов,
+# токен Prometheus и заголовок Server-Timing
+METRICS_DIR = env(
+    'METRICS_DIR',
+    default=os.path.join(tempfile.gettempdir(), 'yatube-metrics')
+)
+METRICS_FLUSH_INTERVAL = env.float('METRICS_FLUSH_INTERVAL', default=5)
+METRICS_RETENTION = env.int('METRICS_RETENTION', default=60 * 60)
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+# Без токена /metrics/ закрыта; INTERNAL_IPS пускаются только явно
+METRICS_ALLOW_INTERNAL_IPS = env.bool(
+    'METRICS_ALLOW_INTERNAL_IPS', default=False
+)
+SERVER_TIMING = env.bool('SERVER_TIMING', default=DEBUG)
+
+# Сколько живёт в кэше пользователь, найденный по токену API
+API_TOKEN_CACHE_TIMEOUT = env.int('API_TOKEN_CACHE_TIMEOUT', default=60 * 5)
+
@@ -0,0 +1,11 @@
+"""
+Настройки тестов (pytest.ini). Тесты очищают кэш, поэтому у них свой
+файл, как и своя база.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, CACHES
+
+CACHE_LOCATION = os.path.join(BASE_DIR, 'test-cache.sqlite3')
+CACHES['default']['OPTIONS']['SHARED']['LOCATION'] = CACHE_LOCATION
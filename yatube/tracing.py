@@ -0,0 +1,125 @@
+"""
+Выборка трассировок Sentry.
+
+Голова: traces_sampler записывает лишь долю запросов (не меньше базовой
+доли маршрута) и не больше TRACES_PER_SECOND в секунду на процесс;
+статика, медиа и служебные адреса не трассируются вовсе.
+Хвост: before_send_transaction всегда оставляет медленные и
+завершившиеся ошибкой запросы, а из остальных — ровно базовую долю.
+"""
+import random
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from django.urls import Resolver404, resolve
+
+
+class TokenBucket:
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+def _path(context):
+    environ = context.get('wsgi_environ')
+    if environ is not None:
+        return environ.get('PATH_INFO', '')
+    scope = context.get('asgi_scope')
+    if scope is not None:
+        return scope.get('path', '')
+    return None
+
+
+def _seconds(value):
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return value.timestamp()
+    return value
+
+
+class Sampler:
+    """
+    rate — базовая доля, rates — доли по именам адресов
+    (TRACES_ROUTE_RATES=index=0.01,post_edit=0.5),
+    record_rate — доля записываемых запросов, среди которых ищутся
+    медленные (slow_ms и дольше), per_second — предел на процесс.
+    """
+
+    def __init__(self, rate, rates=None, record_rate=0.0, slow_ms=500,
+                 per_second=10, skip=(), rand=random.random):
+        self.rate = rate
+        self.rates = {
+            name: float(value) for name, value in (rates or {}).items()
+        }
+        self.record_rate = record_rate
+        self.slow = slow_ms / 1000
+        self.bucket = TokenBucket(per_second)
+        self.skip = tuple(skip)
+        self.random = rand
+        # Для замеров: постоянная доля вместо настроек и без отправки.
+        self.override = None
+
+    def route_rate(self, path):
+        try:
+            name = resolve(path).view_name
+        except Resolver404:
+            return self.rate
+        return self.rates.get(name, self.rate)
+
+    def traces_sampler(self, context):
+        path = _path(context)
+        if path is None:
+            # Не HTTP (команды, задачи) — только по базовой доле.
+            return self.rate
+        if path.startswith(self.skip):
+            return 0
+        if self.override is not None:
+            return self.override
+        record = max(self.route_rate(path), self.record_rate)
+        if not record or self.random() >= record or not self.bucket.take():
+            return 0
+        return 1.0
+
+    def before_send_transaction(self, event, hint):
+        if self.override is not None:
+            return None
+        trace = event.get('contexts', {}).get('trace', {})
+        status = trace.get('status')
+        if status not in (None, 'ok'):
+            return event
+        started = _seconds(event.get('start_timestamp'))
+        finished = _seconds(event.get('timestamp'))
+        if started is not None and finished is not None \
+                and finished - started >= self.slow:
+            return event
+        url = event.get('request', {}).get('url')
+        if url is None:
+            return event
+        rate = self.route_rate(urlsplit(url).path)
+        record = max(rate, self.record_rate)
+        # Из записанных с долей record оставляем rate / record:
+        # итоговая доля быстрых запросов равна базовой.
+        if record and self.random() < rate / record:
+            return event
+        return None
@@ -4,15 +4,34 @@ from django.conf import settings
 from django.conf.urls import handler404, handler500 # noqa
 from django.conf.urls.static import static
 from django.urls import include, path
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+
+from . import metrics
 
 handler404 = 'posts.views.page_not_found' # noqa
 handler500 = 'posts.views.server_error' # noqa
 
+MEDIA_MAX_AGE = 60 * 60 * 24 * 365
+
 def trigger_error(request):
     division_by_zero = 1 / 0
 
+def serve_media(request, path, **kwargs):
+    response = serve(request, path, **kwargs)
+    # Имена картинок и миниатюр зависят от содержимого:
+    # по одному адресу всегда один и тот же файл.
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=MEDIA_MAX_AGE,
+        immutable=True
+    )
+    return response
+
 urlpatterns = [
     path('sentry-debug/', trigger_error),
+    path('metrics/', metrics.metrics, name='metrics'),
     path('auth/',
          include('users.urls')),
     path('auth/',
@@ -48,6 +67,7 @@ if settings.DEBUG:
     import debug_toolbar
     urlpatterns += static(
         settings.MEDIA_URL,
+        view=serve_media,
         document_root=settings.MEDIA_ROOT
     )
     urlpatterns += static(